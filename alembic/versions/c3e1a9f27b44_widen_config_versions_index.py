@@ -0,0 +1,40 @@
+"""Widen config versions index and narrow config_type
+
+Revision ID: c3e1a9f27b44
+Revises: bf6097f4f1a0
+Create Date: 2026-10-15 10:12:41.118204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3e1a9f27b44'
+down_revision: Union[str, None] = 'bf6097f4f1a0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index('idx_config_versions_type_id_version', table_name='config_versions')
+    with op.batch_alter_table('config_versions') as batch_op:
+        batch_op.alter_column('config_type',
+                              existing_type=sa.String(),
+                              type_=sa.Enum('domain', 'country', 'package', name='config_type', native_enum=False),
+                              existing_nullable=True)
+    op.create_index('idx_config_versions_type_id_version', 'config_versions',
+                    ['config_type', 'config_id', sa.text('version DESC'), 'created_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('idx_config_versions_type_id_version', table_name='config_versions')
+    with op.batch_alter_table('config_versions') as batch_op:
+        batch_op.alter_column('config_type',
+                              existing_type=sa.Enum('domain', 'country', 'package', name='config_type', native_enum=False),
+                              type_=sa.String(),
+                              existing_nullable=True)
+    op.create_index('idx_config_versions_type_id_version', 'config_versions',
+                    ['config_type', 'config_id', 'version'], unique=False)
@@ -0,0 +1,54 @@
+# random_values.py
+import string
+
+# Word lists for input steps with randomize enabled (German and Dutch)
+FIRST_NAMES = (
+    # German names
+    'Hans', 'Klaus', 'Peter', 'Michael', 'Wolfgang', 'Thomas', 'Andreas', 'Stefan', 'Martin', 'Christian',
+    'Anna', 'Maria', 'Ursula', 'Monika', 'Elisabeth', 'Petra', 'Sabine', 'Andrea', 'Claudia', 'Susanne',
+    # Dutch names
+    'Jan', 'Piet', 'Klaas', 'Willem', 'Hendrik', 'Maria', 'Anna', 'Sara', 'Emma', 'Sophie',
+)
+LAST_NAMES = (
+    # German names
+    'Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker', 'Schulz', 'Hoffmann',
+    # Dutch names
+    'Jansen', 'de Vries', 'van den Berg', 'Bakker', 'Visser', 'Meijer', 'de Boer', 'Mulder', 'de Groot', 'Bos',
+)
+
+EMAIL_DOMAINS = ('gmail.com', 'outlook.com', 'hotmail.com', 'yahoo.com', 'protonmail.com', 'gmx.de', 'web.de', 't-online.de')
+EMAIL_FIRST_NAMES = ('jan', 'piet', 'klaas', 'hans', 'klaus', 'peter', 'maria', 'anna', 'sara', 'emma')
+EMAIL_LAST_NAMES = ('mueller', 'schmidt', 'schneider', 'jansen', 'devries', 'bakker', 'visser', 'meijer', 'deboer')
+
+# German street names and cities
+STREETS = (
+    'Hauptstraße', 'Schulstraße', 'Bahnhofstraße', 'Gartenstraße', 'Kirchstraße',
+    'Bergstraße', 'Waldstraße', 'Dorfstraße', 'Lindenstraße', 'Poststraße',
+)
+CITIES = (
+    'Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt',
+    'Stuttgart', 'Düsseldorf', 'Leipzig', 'Dortmund', 'Essen',
+)
+
+# German mobile phone prefixes
+PHONE_PREFIXES = ('0151', '0152', '0157', '0159', '0160', '0170', '0171', '0172', '0173', '0174')
+
+HOUSE_NUMBER_LETTERS = ('a', 'b', 'c', 'd')
+
+GENERIC_TERMS = ('test', 'sample', 'example', 'demo', 'trial', 'preview', 'beta', 'review', 'check', 'verify')
+
+# A limited set of special characters that is more likely to work across websites
+PASSWORD_SPECIAL_CHARS = '!@#$%^&*'
+
+# Password alphabet per (include_uppercase, include_numbers, include_special)
+PASSWORD_CHARS = {
+    (upper, numbers, special): (
+        string.ascii_lowercase
+        + (string.ascii_uppercase if upper else '')
+        + (string.digits if numbers else '')
+        + (PASSWORD_SPECIAL_CHARS if special else '')
+    )
+    for upper in (False, True)
+    for numbers in (False, True)
+    for special in (False, True)
+}
@@ -1,6 +1,22 @@
 # selectors.py
+import sys
 
-LENGTH_SELECTORS = {'length', 'lengte', 'height', 'hoogte', 'länge', 'höhe', 'longueur', 'hauteur'}
-WIDTH_SELECTORS = {'width', 'breedte', 'breite', 'largeur'}
-THICKNESS_SELECTORS = {'thickness', 'dikte', 'dicke', 'stärke', 'épaisseur'}
-QUANTITY_SELECTORS = {'qty', 'quantity', 'aantal', 'menge', 'anzahl', 'quantité'}
+LENGTH_SELECTORS = frozenset(map(sys.intern, ('length', 'lengte', 'height', 'hoogte', 'länge', 'höhe', 'longueur', 'hauteur')))
+WIDTH_SELECTORS = frozenset(map(sys.intern, ('width', 'breedte', 'breite', 'largeur')))
+THICKNESS_SELECTORS = frozenset(map(sys.intern, ('thickness', 'dikte', 'dicke', 'stärke', 'épaisseur')))
+QUANTITY_SELECTORS = frozenset(map(sys.intern, ('qty', 'quantity', 'aantal', 'menge', 'anzahl', 'quantité')))
+
+# Dimension fields in the order they take precedence when a selector matches several
+DIMENSION_FIELD_PRIORITY = ('length', 'width', 'thickness', 'quantity')
+
+# Single lookup table mapping every selector token to its dimension field
+DIMENSION_SELECTOR_FIELDS = {
+    token: field
+    for field, tokens in (
+        ('length', LENGTH_SELECTORS),
+        ('width', WIDTH_SELECTORS),
+        ('thickness', THICKNESS_SELECTORS),
+        ('quantity', QUANTITY_SELECTORS),
+    )
+    for token in tokens
+}
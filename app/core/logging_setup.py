@@ -0,0 +1,58 @@
+import atexit
+import logging
+import queue
+import threading
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener
+from pathlib import Path
+
+# Project root (parent of app directory), debug.log wordt hier geschreven
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+# Gebufferde records worden uiterlijk na zoveel seconden naar debug.log geschreven
+LOG_FLUSH_INTERVAL = 5
+
+def configure_once(log_file: Path = BASE_DIR / "debug.log"):
+    """Configureer root logging, maar alleen als er nog geen handlers zijn
+
+    Bij een reloader of een tweede import van main.py zouden handlers anders
+    opstapelen en elk record meerdere keren worden geschreven.
+    """
+    root = logging.getLogger()
+    if root.handlers:
+        return
+
+    # Records are handed off through a queue and the file output is buffered, so
+    # logging calls on the request path never block on a write() per record
+    log_formatter = logging.Formatter("%(asctime)s - %(levelname)s - %(message)s", datefmt="%H:%M:%S")
+
+    console_handler = logging.StreamHandler()  # Output to console
+    console_handler.setFormatter(log_formatter)
+
+    file_handler = logging.FileHandler(log_file, delay=True)  # Opened on the first record
+    file_handler.setFormatter(log_formatter)
+    buffered_file_handler = MemoryHandler(capacity=1024, flushLevel=logging.WARNING, target=file_handler)
+
+    log_queue = queue.SimpleQueue()
+    log_listener = QueueListener(log_queue, console_handler, buffered_file_handler)
+    log_listener.start()
+
+    # Also flush on a timer, so INFO records don't wait for a WARNING (or get lost on a kill)
+    stop_flushing = threading.Event()
+
+    def _flush_periodically():
+        while not stop_flushing.wait(LOG_FLUSH_INTERVAL):
+            buffered_file_handler.flush()
+
+    threading.Thread(target=_flush_periodically, name="log-flush", daemon=True).start()
+
+    # Only pass the message through the queue; the listener's handlers do the formatting
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter("%(message)s"))
+    logging.basicConfig(level=logging.INFO, handlers=[queue_handler], force=False)
+
+    @atexit.register
+    def _stop_logging():
+        """Drain the log queue and flush buffered records on shutdown"""
+        stop_flushing.set()
+        log_listener.stop()
+        buffered_file_handler.close()
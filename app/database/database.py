@@ -2,8 +2,8 @@ from sqlalchemy import create_engine, inspect
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
 import os
+import orjson
 from app.core.config import IS_PRODUCTION, LOCAL_DATABASE_URL
-from app.core.settings import Settings
 
 # In production, use PostgreSQL from Fly.io. In development, use local database
 if IS_PRODUCTION:
@@ -19,8 +19,18 @@ else:
 
 print(f"Using database: {DATABASE_URL}")
 
-# Create SQLAlchemy engine
-engine = create_engine(DATABASE_URL)
+def _json_serializer(value) -> str:
+    return orjson.dumps(value).decode()
+
+# Create SQLAlchemy engine with a compiled statement cache for the hot CRUD queries.
+# JSON columns are (de)serialized with orjson instead of the stdlib json module.
+engine = create_engine(
+    DATABASE_URL,
+    query_cache_size=1200,
+    future=True,
+    json_serializer=_json_serializer,
+    json_deserializer=orjson.loads,
+)
 
 # Create SessionLocal class
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
@@ -31,22 +41,19 @@ Base = declarative_base()
 # Initialize database
 def init_db():
     # Import all models here to avoid circular imports
-    from app.models.models import DomainConfig, CountryConfig, PackageConfig, ConfigVersion
+    from app.models.models import DomainConfig, CountryConfig, PackageConfig, ConfigVersion, Settings
 
     # Check if tables exist
     inspector = inspect(engine)
     existing_tables = inspector.get_table_names()
 
     # Only create tables that don't exist yet
-    if not all(table in existing_tables for table in ['domain_configs', 'country_configs', 'package_configs', 'config_versions']):
+    if not all(table in existing_tables for table in ['domain_configs', 'country_configs', 'package_configs', 'config_versions', 'settings']):
         Base.metadata.create_all(bind=engine)
         print("Created missing database tables")
     else:
         print("All database tables already exist")
 
-    # Create settings table
-    Settings.metadata.create_all(bind=engine)
-
 # Dependency
 def get_db():
     db = SessionLocal()
@@ -1,40 +1,28 @@
-import logging
 from pathlib import Path
 
+from app.core.logging_setup import configure_once
+
 # Get the project root directory (parent of app directory)
 BASE_DIR = Path(__file__).resolve().parent.parent
 STATIC_DIR = BASE_DIR / "static"
 TEMPLATES_DIR = BASE_DIR / "templates"
 
 # Configure logging FIRST, before any other imports that might trigger module-level code
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(levelname)s - %(message)s",
-    datefmt="%H:%M:%S",
-    handlers=[
-        logging.StreamHandler(),  # Output to console
-        logging.FileHandler(BASE_DIR / "debug.log"),  # Also save to file in project root
-    ],
-)
+configure_once()
 
 # Now import everything else (after logging is configured)
 
 from fastapi import FastAPI, HTTPException
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict, HttpUrl
 
+from app.core.config import IS_PRODUCTION
 from app.database.database import init_db
-from app.routes.config_management import router as config_mgmt_router
-from app.routes.country_config import router as country_router
-from app.routes.domain_config import router as domain_router
-from app.routes.package_config import router as package_router
-from app.routes.price_calculation import router as price_router
-from app.routes.settings import router as settings_router
-from app.routes.version_management import router as version_router
-from app.routes.web import router as web_router
+from app.routes.api import api
+from app.services.price_calculator import close_price_calculator
 from app.services.scraper import MaterialScraper
+from app.templating import templates  # Templates for HTML interface (kept for backward compatibility if needed)
 
 # Initialize database on startup
 init_db()
@@ -44,7 +32,9 @@ app = FastAPI(
     title="Competitor Price Watcher",
     description="API for watching competitor prices",
     version="1.0.0",
-    default_response_class=JSONResponse,
+    default_response_class=ORJSONResponse,
+    # Geen OpenAPI schema in productie; /docs is een eigen template en heeft het niet nodig
+    openapi_url=None if IS_PRODUCTION else "/openapi.json",
     timeout=120,
     host="0.0.0.0",
     port=8080,
@@ -54,35 +44,39 @@ app = FastAPI(
 app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 # Include all routers
-app.include_router(web_router)
-app.include_router(price_router)
-app.include_router(domain_router)
-app.include_router(country_router)
-app.include_router(package_router)
-app.include_router(version_router)
-app.include_router(config_mgmt_router)
-app.include_router(settings_router)
-
-# Templates for HTML interface (kept for backward compatibility if needed)
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+app.include_router(api)
+
+# Close the shared Playwright browsers on shutdown
+app.add_event_handler("shutdown", close_price_calculator)
 
 # Legacy models for backward compatibility
 class URLInput(BaseModel):
-    url: str
+    model_config = ConfigDict(frozen=True, extra='ignore', str_strip_whitespace=True)
+
+    url: HttpUrl
+
+class Dimensions(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
+    dikte: float = 2
+    lengte: float = 1000
+    breedte: float = 1000
 
 class DimensionsInput(BaseModel):
-    url: str
-    dimensions: dict[str, float] = {
-        "dikte": 2,
-        "lengte": 1000,
-        "breedte": 1000,
-    }
+    model_config = ConfigDict(frozen=True, extra='ignore', str_strip_whitespace=True)
+
+    url: HttpUrl
+    dimensions: Dimensions = Dimensions()
 
 class AnalyzeResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     url: str
     dimension_fields: dict
 
 class PriceResponse(BaseModel):
+    model_config = ConfigDict(frozen=True)
+
     price_excl_btw: float
     price_incl_btw: float
 
@@ -99,10 +93,11 @@ async def analyze_url(input: URLInput):
     """
     try:
         scraper = MaterialScraper()
-        results = await scraper.analyze_form_fields(input.url)
+        url = str(input.url)
+        results = await scraper.analyze_form_fields(url)
 
         return AnalyzeResponse(
-            url=input.url,
+            url=url,
             dimension_fields=results["dimension_fields"],
         )
     except Exception as e:
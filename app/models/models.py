@@ -1,4 +1,5 @@
-from sqlalchemy import Column, Integer, String, JSON, DateTime, Index
+from sqlalchemy import Column, Integer, String, JSON, DateTime, Index, Enum, text, select
+from sqlalchemy.dialects import postgresql, sqlite
 from sqlalchemy.sql import func
 from app.database.database import Base
 from datetime import datetime
@@ -34,7 +35,7 @@ class ConfigVersion(Base):
     __tablename__ = "config_versions"
 
     id = Column(Integer, primary_key=True, index=True)
-    config_type = Column(String)  # 'domain', 'country', or 'package'
+    config_type = Column(Enum('domain', 'country', 'package', name='config_type', native_enum=False))
     config_id = Column(String)    # domain name, country code, or package id
     config = Column(JSON)
     version = Column(Integer)
@@ -42,8 +43,9 @@ class ConfigVersion(Base):
     comment = Column(String, nullable=True)
 
     __table_args__ = (
-        # Composite index voor sneller zoeken van versies
-        Index('idx_config_versions_type_id_version', 'config_type', 'config_id', 'version'),
+        # Composite index voor sneller zoeken van versies; version DESC zodat
+        # "laatste versie" (ORDER BY version DESC LIMIT 1) direct uit de index komt
+        Index('idx_config_versions_type_id_version', 'config_type', 'config_id', text('version DESC'), 'created_at'),
     )
 
 class Settings(Base):
@@ -59,19 +61,23 @@ class Settings(Base):
     def __repr__(self):
         return f'<Setting {self.key}>'
 
-    @staticmethod
-    def get_value(key, default=None):
+    @classmethod
+    def get_value(cls, session, key, default=None):
         """Get a setting value by key"""
-        setting = Settings.query.filter_by(key=key).first()
-        return setting.value if setting else default
+        # key is unique but not the primary key (id is), so session.get() can't be used
+        row = session.execute(select(cls.value).where(cls.key == key)).first()
+        return row.value if row else default
 
-    @staticmethod
-    def set_value(key, value):
+    @classmethod
+    def set_value(cls, session, key, value):
         """Set a setting value"""
-        setting = Settings.query.filter_by(key=key).first()
-        if setting:
-            setting.value = value
-        else:
-            setting = Settings(key=key, value=value)
-            db.session.add(setting)
-        db.session.commit()
+        # Eén INSERT ... ON CONFLICT (key) DO UPDATE; SQLite (dev) en PostgreSQL (prod) ondersteunen beide
+        dialect = postgresql if session.get_bind().dialect.name == 'postgresql' else sqlite
+        now = datetime.utcnow()
+        stmt = dialect.insert(cls).values(key=key, value=value, created_at=now, updated_at=now)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[cls.key],
+            set_={'value': stmt.excluded.value, 'updated_at': now},
+        )
+        session.execute(stmt)
+        session.commit()
@@ -0,0 +1,24 @@
+from fastapi import APIRouter
+
+from app.routes.config_management import router as config_mgmt_router
+from app.routes.country_config import router as country_router
+from app.routes.domain_config import router as domain_router
+from app.routes.package_config import router as package_router
+from app.routes.price_calculation import router as price_router
+from app.routes.settings import router as settings_router
+from app.routes.version_management import router as version_router
+from app.routes.web import router as web_router
+
+# Alle routers samengevoegd bij import, zodat main.py maar één include_router nodig heeft
+api = APIRouter()
+for _router in (
+    web_router,
+    price_router,
+    domain_router,
+    country_router,
+    package_router,
+    version_router,
+    config_mgmt_router,
+    settings_router,
+):
+    api.include_router(_router)
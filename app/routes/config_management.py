@@ -1,29 +1,37 @@
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File
-from fastapi.responses import FileResponse
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
-from app.database.database import get_db
-from app.services.config_manager import export_configs_to_file, import_configs_from_file
+from app.database.database import SessionLocal, get_db
+from app.services.config_manager import import_configs_from_file, iter_export_json
+import shutil
 import tempfile
 import os
 
 # Create router instance
 router = APIRouter()
 
+# Chunk size used when spooling uploads to disk
+UPLOAD_CHUNK_SIZE = 64 * 1024
+
+def _stream_export():
+    """Stream the export with its own session, since it outlives the request handler"""
+    db = SessionLocal()
+    try:
+        yield from iter_export_json(db)
+    finally:
+        db.close()
+
 @router.post("/api/configs/export")
-async def export_configs_endpoint(db: Session = Depends(get_db)):
+async def export_configs_endpoint():
     """
-    Export all configurations to a JSON file and return it.
+    Export all configurations as a JSON file download.
     """
     try:
-        # Create a temporary file
-        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as tmp:
-            export_configs_to_file(db, tmp.name)
-            return FileResponse(
-                tmp.name,
-                media_type='application/json',
-                filename='configs_backup.json',
-                background=None
-            )
+        return StreamingResponse(
+            _stream_export(),
+            media_type='application/json',
+            headers={'Content-Disposition': 'attachment; filename="configs_backup.json"'}
+        )
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -36,20 +44,20 @@ async def import_configs_endpoint(
     """
     Import configurations from a JSON file.
     """
+    tmp_path = None
     try:
-        # Create a temporary file to store the uploaded content
-        with tempfile.NamedTemporaryFile(delete=False) as tmp:
-            content = await file.read()
-            tmp.write(content)
-            tmp.flush()
+        # Copy the upload to a temporary file in fixed-size chunks
+        with tempfile.NamedTemporaryFile(delete=False, suffix='.json') as tmp:
+            tmp_path = tmp.name
+            shutil.copyfileobj(file.file, tmp, UPLOAD_CHUNK_SIZE)
 
-            # Import the configurations
-            import_configs_from_file(db, tmp.name, clear_existing)
+        # Import the configurations
+        import_configs_from_file(db, tmp_path, clear_existing)
 
         return {"message": "Configurations imported successfully"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
     finally:
         # Clean up the temporary file
-        if 'tmp' in locals():
-            os.unlink(tmp.name)
+        if tmp_path:
+            os.unlink(tmp_path)
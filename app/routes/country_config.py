@@ -2,17 +2,17 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 import app.services.crud as crud, app.schemas.schemas as schemas
-from app.schemas.country import CountryRequest
+from app.schemas.country import CountryCode, CountryRequest
 
 # Create router instance
 router = APIRouter()
 
 @router.get("/api/country/{country}")
-async def get_country_config(country: str, db: Session = Depends(get_db)):
-    config = crud.get_country_config(db, country)
-    if not config:
+async def get_country_config(country: CountryCode, db: Session = Depends(get_db)):
+    config = crud.get_cached_country_config(db, country)
+    if config is None:
         raise HTTPException(status_code=404, detail="Country configuration not found")
-    return config.config
+    return config
 
 @router.post("/api/country")
 async def save_country_config(request: CountryRequest, db: Session = Depends(get_db)):
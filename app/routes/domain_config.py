@@ -1,5 +1,4 @@
-from fastapi import APIRouter, HTTPException, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Depends, Response
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 import app.services.crud as crud, app.schemas.schemas as schemas
@@ -9,30 +8,35 @@ from app.schemas.config import ConfigRequest
 # Create router instance
 router = APIRouter()
 
+def _fast_unquote(s: str) -> str:
+    """URL decode, skipping unquote() for the common case without percent-encoding"""
+    return s if '%' not in s else unquote(s)
+
 @router.get("/api/config/{domain}")
 async def get_config(domain: str, db: Session = Depends(get_db)):
     # URL decode the domain
-    decoded_domain = unquote(domain)
+    decoded_domain = _fast_unquote(domain)
 
-    config = crud.get_domain_config(db, decoded_domain)
-    if not config:
+    config = crud.get_cached_domain_config(db, decoded_domain)
+    if config is None:
         raise HTTPException(status_code=404, detail="Configuration not found")
-    return config.config
+    return config
 
 @router.post("/api/config")
-async def save_config(request: ConfigRequest, db: Session = Depends(get_db)):
+async def save_config(request: ConfigRequest, response: Response, db: Session = Depends(get_db)):
     try:
         # Save configuration to database
         config = schemas.DomainConfigCreate(domain=request.domain, config=request.config)
         crud.create_domain_config(db, config)
-        return JSONResponse({"success": True})
+        return {"success": True}
     except Exception as e:
-        return JSONResponse({"success": False, "error": str(e)}, status_code=500)
+        response.status_code = 500
+        return {"success": False, "error": str(e)}
 
 @router.delete("/api/config/{domain}")
 async def delete_config(domain: str, db: Session = Depends(get_db)):
     # URL decode the domain
-    decoded_domain = unquote(domain)
+    decoded_domain = _fast_unquote(domain)
 
     if not crud.delete_domain_config(db, decoded_domain):
         raise HTTPException(status_code=404, detail="Configuration not found")
@@ -2,7 +2,7 @@ from fastapi import APIRouter, HTTPException, Depends
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 import app.services.crud as crud, app.schemas.schemas as schemas
-from app.schemas.package import PackageRequest
+from app.schemas.package import PackageId, PackageRequest
 
 # Create router instance
 router = APIRouter()
@@ -10,16 +10,16 @@ router = APIRouter()
 @router.get("/api/packages")
 async def get_packages(db: Session = Depends(get_db)):
     """Get all package configurations"""
-    packages = {config.package_id: config.config for config in crud.get_package_configs(db)}
+    packages = crud.get_cached_package_configs(db)
     return {"packages": packages}
 
 @router.get("/api/packages/{package_id}")
-async def get_package(package_id: str, db: Session = Depends(get_db)):
+async def get_package(package_id: PackageId, db: Session = Depends(get_db)):
     """Get a specific package configuration"""
-    config = crud.get_package_config(db, package_id)
-    if not config:
+    config = crud.get_cached_package_config(db, package_id)
+    if config is None:
         raise HTTPException(status_code=404, detail="Package configuration not found")
-    return config.config
+    return config
 
 @router.post("/api/packages")
 async def save_package(request: PackageRequest, db: Session = Depends(get_db)):
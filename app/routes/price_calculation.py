@@ -1,88 +1,154 @@
 from fastapi import APIRouter, HTTPException, Depends, Request
-from fastapi.responses import JSONResponse
-import json
+import orjson
 import asyncio
 import logging
-from app.services.price_calculator import PriceCalculator
+from app.services.price_calculator import PriceCalculator, get_price_calculator
 from sse_starlette.sse import EventSourceResponse
 from sqlalchemy.orm import Session
-from app.database.database import get_db
+from app.core.config import CALC_CONCURRENCY, CALC_QUEUE_TIMEOUT
+from app.database.database import SessionLocal, get_db
 import app.services.crud as crud
 from app.schemas.calculate import SquareMeterPriceRequest, ShippingRequest
 
+logger = logging.getLogger(__name__)
+
 # Create router instance
 router = APIRouter()
 
-@router.post("/api/calculate-smp")
-async def calculate_square_meter_price(request: SquareMeterPriceRequest, db: Session = Depends(get_db)):
+# Seconden zonder status update voordat de SSE stream een heartbeat stuurt
+STATUS_HEARTBEAT_INTERVAL = 15
+
+# Maximaal aantal gelijktijdige SSE status streams; daarboven wordt een nieuwe verbinding geweigerd
+MAX_STATUS_STREAMS = 100
+
+# Elke berekening opent een eigen browser context; begrens hoeveel er tegelijk draaien
+_calculation_slots = asyncio.Semaphore(CALC_CONCURRENCY)
+_calculations_waiting = 0
+
+class CalculationQueueTimeout(Exception):
+    """No calculation slot became free within CALC_QUEUE_TIMEOUT"""
+
+async def _calculate_price_limited(calculator: PriceCalculator, *args, **kwargs):
+    """Run calculate_price once a calculation slot is free"""
+    global _calculations_waiting
+    _calculations_waiting += 1
     try:
-        # Initialize calculator with fresh configs for each request
-        calculator = PriceCalculator()
-        dimensions = {
-            'thickness': request.dikte,
-            'length': request.lengte,
-            'width': request.breedte,
-            'quantity': request.quantity  # Voeg quantity toe aan dimensions
-        }
+        await asyncio.wait_for(_calculation_slots.acquire(), CALC_QUEUE_TIMEOUT)
+    except asyncio.TimeoutError:
+        logger.warning("No calculation slot free after %gs (%d waiting)", CALC_QUEUE_TIMEOUT, _calculations_waiting)
+        raise CalculationQueueTimeout("Too many price calculations in progress, try again later")
+    finally:
+        _calculations_waiting -= 1
 
-        price_excl_vat, price_incl_vat = await calculator.calculate_price(
-            request.url,
-            dimensions,
-            country=request.country,
-            category='square_meter_price'
-        )
+    try:
+        return await calculator.calculate_price(*args, **kwargs)
+    finally:
+        _calculation_slots.release()
+
+def _load_country_meta(country: str) -> crud.CountryMeta:
+    """Country meta in a worker thread, with its own session
 
-        country_config = crud.get_country_config(db, request.country)
-        if not country_config:
-            country_config = crud.get_country_config(db, 'nl')  # Fallback to NL
-        country_info = country_config.config
+    The request session can't be used here: when the calculation fails first,
+    the handler returns and closes it while this thread may still be querying.
+    """
+    db = SessionLocal()
+    try:
+        return crud.get_country_meta(db, country)
+    finally:
+        db.close()
+
+async def _run_calculation(url: str, dimensions: dict, country: str, category: str, message: str, extra_data: dict = None):
+    """Run a price calculation and build the shared success response
+
+    The country lookup runs while the scraper is busy; errors are mapped to
+    400 (ValueError), 503 (no free calculation slot) or 500 (anything else).
+    """
+    try:
+        # Shared calculator; its configs are reloaded whenever a domain config changes
+        calculator = get_price_calculator()
+
+        # Landgegevens ophalen terwijl de scraper bezig is
+        calculation = asyncio.create_task(_calculate_price_limited(
+            calculator,
+            url,
+            dimensions,
+            country=country,
+            category=category
+        ))
+        country_lookup = asyncio.create_task(asyncio.to_thread(_load_country_meta, country))  # Fallback to NL
+        try:
+            (price_excl_vat, price_incl_vat), (currency, currency_symbol, vat_rate) = await asyncio.gather(
+                calculation, country_lookup
+            )
+        except BaseException:
+            # Faalt één van beide, dan de ander stoppen: anders houdt de berekening zijn
+            # pagina en calculation slot vast voor een request waar niemand meer op wacht
+            for task in (calculation, country_lookup):
+                task.cancel()
+            raise
+
+        data = {
+            "price_excl_vat": round(price_excl_vat, 2),
+            "price_incl_vat": round(price_incl_vat, 2),
+            "currency": currency,
+            "currency_symbol": currency_symbol,
+            "vat_rate": vat_rate
+        }
+        if extra_data:
+            data.update(extra_data)
 
         return {
             "status": "success",
             "status_code": 200,
-            "message": "Square meter price calculated successfully",
-            "data": {
-                "price_excl_vat": round(price_excl_vat, 2),
-                "price_incl_vat": round(price_incl_vat, 2),
-                "currency": country_info['currency'],
-                "currency_symbol": country_info['currency_symbol'],
-                "vat_rate": country_info['vat_rate']
-            }
+            "message": message,
+            "data": data
         }
-    except ValueError as e:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "status": "error",
-                "status_code": 400,
-                "message": str(e),
-                "error_type": "ValueError"
-            }
-        )
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "status": "error",
-                "status_code": 500,
-                "message": str(e),
-                "error_type": type(e).__name__
-            }
-        )
+        raise _calculation_error(e)
+
+def _calculation_error(e: Exception) -> HTTPException:
+    """Map an exception from a calculation to the API's error response"""
+    if isinstance(e, CalculationQueueTimeout):
+        status_code = 503
+    elif isinstance(e, ValueError):
+        status_code = 400
+    else:
+        status_code = 500
+    return HTTPException(
+        status_code=status_code,
+        detail={
+            "status": "error",
+            "status_code": status_code,
+            "message": str(e),
+            "error_type": type(e).__name__
+        }
+    )
+
+@router.post("/api/calculate-smp")
+async def calculate_square_meter_price(request: SquareMeterPriceRequest):
+    dimensions = {
+        'thickness': request.dikte,
+        'length': request.lengte,
+        'width': request.breedte,
+        'quantity': request.quantity  # Voeg quantity toe aan dimensions
+    }
+
+    return await _run_calculation(
+        request.url, dimensions, request.country,
+        category='square_meter_price',
+        message="Square meter price calculated successfully"
+    )
 
 @router.post("/api/calculate-shipping")
 async def calculate_shipping(request: ShippingRequest, db: Session = Depends(get_db)):
     """Calculate shipping costs"""
+    package_id = str(request.package_type)
     try:
-        # Initialize calculator with fresh configs for each request
-        calculator = PriceCalculator()
-        package_id = str(request.package_type)
-        package_config = crud.get_package_config(db, package_id)
-        if not package_config:
+        # Lookup in de gecachte set van alle pakketten, zodat ook een ongeldig type de DB niet raakt
+        package = crud.get_cached_package_configs(db).get(package_id)
+        if package is None:
             raise ValueError(f"Invalid package type: {request.package_type}. Must be between 1 and 6.")
 
-        package = package_config.config
-
         # Determine the quantity to use (from request or from package config)
         actual_quantity = request.quantity if request.quantity is not None else package['quantity']
 
@@ -98,80 +164,65 @@ async def calculate_shipping(request: ShippingRequest, db: Session = Depends(get
             'display': package['display']
         }
 
-        # Log the complete dimensions for debugging
-        logging.info(f"Using package dimensions for calculation: {dimensions}")
-
-        price_excl_vat, price_incl_vat = await calculator.calculate_price(
-            request.url,
-            dimensions,
-            country=request.country,
-            category='shipping'
-        )
-
-        country_config = crud.get_country_config(db, request.country)
-        if not country_config:
-            country_config = crud.get_country_config(db, 'nl')  # Fallback to NL
-        country_info = country_config.config
-
-        return {
-            "status": "success",
-            "status_code": 200,
-            "message": "Shipping costs calculated successfully",
-            "data": {
-                "price_excl_vat": round(price_excl_vat, 2),
-                "price_incl_vat": round(price_incl_vat, 2),
-                "currency": country_info['currency'],
-                "currency_symbol": country_info['currency_symbol'],
-                "vat_rate": country_info['vat_rate'],
-                "package_info": {
-                    "type": request.package_type,
-                    "name": package['name'],
-                    "description": package['description'],
-                    "quantity": actual_quantity,  # Use the determined quantity
-                    "dimensions": f"{package['length']}x{package['width']} mm",
-                    "thickness": dimensions['thickness'],  # Use the actual thickness being used
-                    "display": package['display']
-                }
-            }
+        # Package info for the response, built once from the dimensions; it doesn't depend on the price
+        package_info = {
+            "type": request.package_type,
+            "name": dimensions['name'],
+            "description": dimensions['description'],
+            "quantity": actual_quantity,  # Use the determined quantity
+            "dimensions": f"{dimensions['length']}x{dimensions['width']} mm",
+            "thickness": dimensions['thickness'],  # Use the actual thickness being used
+            "display": dimensions['display']
         }
-    except ValueError as e:
-        raise HTTPException(
-            status_code=400,
-            detail={
-                "status": "error",
-                "status_code": 400,
-                "message": str(e),
-                "error_type": "ValueError"
-            }
-        )
     except Exception as e:
-        raise HTTPException(
-            status_code=500,
-            detail={
-                "status": "error",
-                "status_code": 500,
-                "message": str(e),
-                "error_type": type(e).__name__
-            }
-        )
+        raise _calculation_error(e)
 
-async def price_status_stream(request: Request):
-    """SSE endpoint voor real-time status updates"""
-    async def event_generator():
+    # Log the complete dimensions for debugging
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Using package dimensions for calculation: %r", dimensions)
+
+    return await _run_calculation(
+        request.url, dimensions, request.country,
+        category='shipping',
+        message="Shipping costs calculated successfully",
+        extra_data={"package_info": package_info}
+    )
+
+async def _status_events(request: Request, queue: asyncio.Queue):
+    """Status updates for one SSE client, as sse-starlette event dicts; unsubscribes the queue when done"""
+    try:
         while True:
             if await request.is_disconnected():
                 break
 
-            if PriceCalculator.latest_status:
-                yield {
-                    "event": "status",
-                    "data": json.dumps(PriceCalculator.latest_status)
-                }
-                PriceCalculator.latest_status = None
+            # Wacht op de volgende status i.p.v. te pollen; heartbeat als het stil blijft
+            try:
+                status = await asyncio.wait_for(queue.get(), timeout=STATUS_HEARTBEAT_INTERVAL)
+            except asyncio.TimeoutError:
+                yield {"comment": "heartbeat"}
+                continue
 
-            await asyncio.sleep(0.1)
+            yield {
+                "event": "status",
+                "data": orjson.dumps(status, option=orjson.OPT_NON_STR_KEYS).decode()
+            }
+    finally:
+        PriceCalculator.unsubscribe_status(queue)
 
-    return EventSourceResponse(event_generator())
+async def price_status_stream(request: Request):
+    """SSE endpoint voor real-time status updates"""
+    # Weiger nieuwe streams voordat er een verbinding open blijft staan als er al te veel zijn
+    if len(PriceCalculator.status_subscribers) >= MAX_STATUS_STREAMS:
+        raise HTTPException(status_code=503, detail="Too many open status streams")
+
+    # Direct na de check abonneren (geen await ertussen), zodat gelijktijdige verbindingen de limiet niet samen passeren.
+    # Elke client krijgt zijn eigen queue, zodat alle clients elke update zien
+    queue = PriceCalculator.subscribe_status()
+    try:
+        return EventSourceResponse(_status_events(request, queue))
+    except Exception:
+        PriceCalculator.unsubscribe_status(queue)
+        raise
 
 # Add SSE route to router
 router.add_route("/api/status-stream", price_status_stream)
@@ -1,21 +1,13 @@
 from fastapi import APIRouter, HTTPException, Depends, Request, Form
 from fastapi.responses import HTMLResponse
-from fastapi.templating import Jinja2Templates
 from sqlalchemy.orm import Session
-from pathlib import Path
 from app.database.database import get_db
+from app.templating import templates
 from app.core.settings import Settings
 
 # Create router instance
 router = APIRouter()
 
-# Get the project root directory (parent of app directory)
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-TEMPLATES_DIR = BASE_DIR / "templates"
-
-# Templates for rendering HTML pages
-templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
-
 @router.get("/settings", name="settings")
 async def settings_page(request: Request, db: Session = Depends(get_db)):
     """Settings page for configuring application settings"""
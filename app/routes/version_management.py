@@ -1,23 +1,24 @@
-from fastapi import APIRouter, HTTPException, Depends
+from fastapi import APIRouter, HTTPException, Depends, Query, Response
 from datetime import datetime
 from sqlalchemy.orm import Session
 from app.database.database import get_db
 import app.services.crud as crud
 from urllib.parse import unquote
 from app.schemas.version import VersionResponse
+from app.schemas.country import CountryCode
+from app.schemas.package import PackageId
 
 # Create router instance
 router = APIRouter()
 
-@router.get("/api/config/{domain}/versions")
-async def get_domain_versions(domain: str, db: Session = Depends(get_db)):
-    """Haal alle versies op van een domein configuratie"""
-    # URL decode the domain
-    decoded_domain = unquote(domain)
-
-    versions = crud.get_config_versions(db, 'domain', decoded_domain)
+def _list_versions(db: Session, response: Response, config_type: str, config_id: str,
+                   limit: int, offset: int, include_total: bool):
+    """Eén pagina versies (nieuwste eerst); het totaal alleen als de client erom vraagt"""
+    versions = crud.get_config_versions(db, config_type, config_id, skip=offset, limit=limit)
     if not versions:
         raise HTTPException(status_code=404, detail="No versions found")
+    if include_total:
+        response.headers["X-Total-Count"] = str(crud.count_config_versions(db, config_type, config_id))
     return [VersionResponse(
         version=v.version,
         created_at=v.created_at,
@@ -25,6 +26,14 @@ async def get_domain_versions(domain: str, db: Session = Depends(get_db)):
         config=v.config
     ) for v in versions]
 
+@router.get("/api/config/{domain}/versions")
+async def get_domain_versions(domain: str, response: Response, limit: int = Query(5, ge=1, le=50), offset: int = Query(0, ge=0), include_total: bool = False, db: Session = Depends(get_db)):
+    """Haal alle versies op van een domein configuratie"""
+    # URL decode the domain
+    decoded_domain = unquote(domain)
+
+    return _list_versions(db, response, 'domain', decoded_domain, limit, offset, include_total)
+
 @router.post("/api/config/{domain}/restore/{version}")
 async def restore_domain_version(domain: str, version: int, db: Session = Depends(get_db)):
     """Herstel een specifieke versie van een domein configuratie"""
@@ -37,20 +46,12 @@ async def restore_domain_version(domain: str, version: int, db: Session = Depend
     return {"success": True}
 
 @router.get("/api/country/{country}/versions")
-async def get_country_versions(country: str, db: Session = Depends(get_db)):
+async def get_country_versions(country: CountryCode, response: Response, limit: int = Query(5, ge=1, le=50), offset: int = Query(0, ge=0), include_total: bool = False, db: Session = Depends(get_db)):
     """Haal alle versies op van een land configuratie"""
-    versions = crud.get_config_versions(db, 'country', country)
-    if not versions:
-        raise HTTPException(status_code=404, detail="No versions found")
-    return [VersionResponse(
-        version=v.version,
-        created_at=v.created_at,
-        comment=v.comment,
-        config=v.config
-    ) for v in versions]
+    return _list_versions(db, response, 'country', country, limit, offset, include_total)
 
 @router.post("/api/country/{country}/restore/{version}")
-async def restore_country_version(country: str, version: int, db: Session = Depends(get_db)):
+async def restore_country_version(country: CountryCode, version: int, db: Session = Depends(get_db)):
     """Herstel een specifieke versie van een land configuratie"""
     config = crud.restore_config_version(db, 'country', country, version)
     if not config:
@@ -58,20 +59,12 @@ async def restore_country_version(country: str, version: int, db: Session = Depe
     return {"success": True}
 
 @router.get("/api/packages/{package_id}/versions")
-async def get_package_versions(package_id: str, db: Session = Depends(get_db)):
+async def get_package_versions(package_id: PackageId, response: Response, limit: int = Query(5, ge=1, le=50), offset: int = Query(0, ge=0), include_total: bool = False, db: Session = Depends(get_db)):
     """Haal alle versies op van een pakket configuratie"""
-    versions = crud.get_config_versions(db, 'package', package_id)
-    if not versions:
-        raise HTTPException(status_code=404, detail="No versions found")
-    return [VersionResponse(
-        version=v.version,
-        created_at=v.created_at,
-        comment=v.comment,
-        config=v.config
-    ) for v in versions]
+    return _list_versions(db, response, 'package', package_id, limit, offset, include_total)
 
 @router.post("/api/packages/{package_id}/restore/{version}")
-async def restore_package_version(package_id: str, version: int, db: Session = Depends(get_db)):
+async def restore_package_version(package_id: PackageId, version: int, db: Session = Depends(get_db)):
     """Herstel een specifieke versie van een pakket configuratie"""
     config = crud.restore_config_version(db, 'package', package_id, version)
     if not config:
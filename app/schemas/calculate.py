@@ -1,16 +1,21 @@
-from pydantic import BaseModel
+from typing import Annotated, Optional
+from pydantic import BaseModel, ConfigDict, Field
 
 class SquareMeterPriceRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     url: str
-    dikte: float
-    lengte: float
-    breedte: float
+    dikte: Annotated[float, Field(gt=0)]
+    lengte: Annotated[float, Field(gt=0)]
+    breedte: Annotated[float, Field(gt=0)]
     country: str = 'nl'
-    quantity: int = 1  # Standaardwaarde is 1 stuk
+    quantity: Annotated[int, Field(ge=1)] = 1  # Standaardwaarde is 1 stuk
 
 class ShippingRequest(BaseModel):
+    model_config = ConfigDict(frozen=True, extra='ignore')
+
     url: str
     country: str = 'nl'
-    package_type: int = 1  # 1-6 for different package sizes
-    thickness: float = None  # Optional override for package thickness
-    quantity: int = None  # Optional override for package quantity
+    package_type: Annotated[int, Field(ge=1)] = 1  # 1-6 for different package sizes
+    thickness: Optional[Annotated[float, Field(gt=0)]] = None  # Optional override for package thickness
+    quantity: Optional[Annotated[int, Field(ge=1)]] = None  # Optional override for package quantity
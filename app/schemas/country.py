@@ -1,7 +1,11 @@
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Annotated, Dict, Any
+from fastapi import Path
 from datetime import datetime
 
+# Landcode in een URL pad, bijv. 'nl' of 'be-fr'
+CountryCode = Annotated[str, Path(pattern=r'^[a-z]{2}(-[a-z]{2})?$', max_length=5)]
+
 class ConfigBase(BaseModel):
     config: Dict[str, Any]
 
@@ -1,7 +1,11 @@
 from pydantic import BaseModel
-from typing import Dict, Any
+from typing import Annotated, Dict, Any
+from fastapi import Path
 from datetime import datetime
 
+# Pakket id in een URL pad, pakketten zijn genummerd
+PackageId = Annotated[str, Path(pattern=r'^[0-9]+$', max_length=10)]
+
 class ConfigBase(BaseModel):
     config: Dict[str, Any]
 
@@ -1,22 +1,206 @@
+import asyncio
+import logging
+import math
+import re
+import time
+from types import MappingProxyType
+from typing import Dict, List
+from urllib.parse import urlparse
+
+import aiohttp
+
+logger = logging.getLogger(__name__)
+
+# Prijspatronen voor _collect_price_elements in één alternatie:
+# €20,00 / EUR 20,00 (groep 1) of 20,00€ / 20,00 EUR (groep 2)
+_PRICE_RE = re.compile(r'(?:€\s*|eur\s*)(\d+(?:[.,]\d{2})?)|(\d+(?:[.,]\d{2})?)\s*(?:€|eur)', re.IGNORECASE)
+
+
+def _fast_price_parse(s: str) -> float:
+    """Parse een door _PRICE_RE gematchte prijs ('20', '20,00' of '20.00') zonder replace()"""
+    if len(s) < 4 or s[-3] not in '.,':
+        return float(s)
+    return int(s[:-3]) + int(s[-2:]) / 100.0
+
+
+# Deler van mm naar de eenheid die het domein verwacht
+_MM_DIVISOR = {'cm': 10}
+
+# BTW-indicatie bij een gevonden prijs
+_BTW_INCL_RE = re.compile(r'incl\.?|inclusief|inc\.', re.IGNORECASE)
+
+# Indicatoren voor _find_changed_prices (nieuwe prijs / fallback-kandidaat)
+_PRICE_INDICATOR_RE = re.compile(r'€|eur|prijs|price|total|bedrag', re.IGNORECASE)
+_FALLBACK_TERM_RE = re.compile(r'totaal|total|prijs|price', re.IGNORECASE)
+
+# API endpoints for the supported external captcha services
+_CAPTCHA_ENDPOINTS = MappingProxyType({
+    '2Captcha': {
+        'submit': 'https://2captcha.com/in.php',
+        'retrieve': 'https://2captcha.com/res.php'
+    },
+    'Anti-Captcha': {
+        'submit': 'https://api.anti-captcha.com/createTask',
+        'retrieve': 'https://api.anti-captcha.com/getTaskResult'
+    },
+    'CapMonster': {
+        'submit': 'https://api.capmonster.cloud/createTask',
+        'retrieve': 'https://api.capmonster.cloud/getTaskResult'
+    }
+})
+
+# Polling van externe captcha-services: reCAPTCHA v2 is zelden binnen ~15s opgelost
+_CAPTCHA_FIRST_POLL_DELAY = 15
+_CAPTCHA_POLL_INTERVAL = 2
+
+# Loopt alle selectors in de browser af en geeft per uniek element {element_id, text} terug
+# (tekst in originele case; de regexes zijn case-insensitive).
+# Geneste wrappers met hetzelfde id en dezelfde tekst (bv. div > div > span) komen maar één keer mee.
+_COLLECT_TEXT_JS = """selectors => {
+    const seen = new WeakSet();
+    const keys = new Set();
+    const out = [];
+    for (const s of selectors) {
+        for (const el of document.querySelectorAll(s)) {
+            if (seen.has(el)) continue;
+            seen.add(el);
+            const raw = el.textContent || '';
+            const text = raw.trim();
+            // Goedkope voorfilter: zonder valuta-token kan _PRICE_RE nooit matchen
+            if (!text || !/€|eur/i.test(text)) continue;
+            const element_id = el.id || el.className || (el.tagName + '_' + raw.substring(0, 20));
+            const key = element_id + '\\u0000' + text;
+            if (keys.has(key)) continue;
+            keys.add(key);
+            out.push({element_id, text});
+        }
+    }
+    return out;
+}"""
+
+
+# Captcha-scripts worden elk één keer per pagina als window-functie geregistreerd
+# (_ensure_captcha_script) en daarna alleen nog bij naam aangeroepen
+_CAPTCHA_EXTRACT_JS = r"""
+window.__opgExtractKey = () => {
+    const sitekeyRe = /('sitekey'|"sitekey"|sitekey)(\s*):(\s*)(['"`])((\\.|[^\\])*?)\4/i;
+    const srcKeyRe = /[?&]k=([^&]+)/i;
+    let fromScriptSrc = null;
+    let fromIframe = null;
+
+    // Method 1 (data-sitekey on a recaptcha element) and Method 5 (iframe src) in one pass
+    const elements = document.querySelectorAll('[class*=recaptcha][data-sitekey], iframe[src*="recaptcha"]');
+    for (const el of elements) {
+        if (el.hasAttribute('data-sitekey')) {
+            return el.getAttribute('data-sitekey');
+        }
+        if (!fromIframe) {
+            const match = (el.getAttribute('src') || '').match(srcKeyRe);
+            if (match && match[1]) {
+                fromIframe = match[1];
+            }
+        }
+    }
+
+    // Method 3 (script source) and Method 4 (script src attribute) in one pass
+    const scripts = document.querySelectorAll('script');
+    for (const script of scripts) {
+        const text = script.textContent || script.innerText || '';
+        const match = text.match(sitekeyRe);
+        if (match && match[5]) {
+            return match[5];
+        }
+        if (!fromScriptSrc) {
+            const src = script.getAttribute('src') || '';
+            if (src.includes('recaptcha')) {
+                const srcMatch = src.match(srcKeyRe);
+                if (srcMatch && srcMatch[1]) {
+                    fromScriptSrc = srcMatch[1];
+                }
+            }
+        }
+    }
+
+    return fromScriptSrc || fromIframe || null;
+};
+"""
+
+_CAPTCHA_APPLY_JS = r"""
+window.__opgApplyCaptcha = async (solution) => {
+    // Create a textarea or find existing one if the challenge is active
+    const existing = document.querySelector('textarea#g-recaptcha-response');
+
+    if (existing) {
+        // If the textarea already exists, just set its value
+        existing.value = solution;
+    } else {
+        // Create a new textarea if needed
+        const textarea = document.createElement('textarea');
+        textarea.id = 'g-recaptcha-response';
+        textarea.name = 'g-recaptcha-response';
+        textarea.className = 'g-recaptcha-response';
+        textarea.style.display = 'none';
+        textarea.value = solution;
+        document.body.appendChild(textarea);
+    }
+
+    // Trigger events to make the site recognize the solved captcha
+    document.dispatchEvent(new Event('captcha-solution'));
+
+    // Try to trigger success callbacks
+    if (window.___grecaptcha_cfg && window.___grecaptcha_cfg.clients) {
+        const clients = Object.values(window.___grecaptcha_cfg.clients);
+        for (const client of clients) {
+            try {
+                // Different versions of reCAPTCHA have different structures
+                // Try to find and call the callback
+                if (client && client.iY) {
+                    const callback = client.iY.callback;
+                    if (typeof callback === 'function') {
+                        callback(solution);
+                    }
+                }
+            } catch (e) {
+                console.error('Error triggering reCAPTCHA callback:', e);
+            }
+        }
+    }
+
+    // Wait a moment for any callbacks to execute
+    await new Promise(resolve => setTimeout(resolve, 2000));
+
+    // Look for newly enabled submit buttons
+    const buttons = document.querySelectorAll('button:not([disabled]), input[type="submit"]:not([disabled])');
+    for (const button of buttons) {
+        // Check if it's visible
+        const style = window.getComputedStyle(button);
+        if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
+            // Might be a submit button that was enabled after solving captcha
+            // Don't click automatically, as it might submit a form before all fields are filled
+            // Just return that we found an enabled button
+            return true;
+        }
+    }
+    return false;
+};
+"""
+
+
 def _convert_dimensions(self, dimensions: Dict[str, float], units: Dict[str, str]) -> Dict[str, float]:
     """Convert dimensions to the units required by the domain"""
-    converted = {}
+    # Input is in mm; mm en onbekende eenheden blijven ongewijzigd (geen deling, dus ints blijven ints)
+    thickness_div = _MM_DIVISOR.get(units.get('thickness'))
+    dimension_div = _MM_DIVISOR.get(units.get('dimensions', 'mm'))
 
-    # Handle thickness separately
+    converted = {}
     if 'thickness' in dimensions:
-        if units.get('thickness') == 'cm':
-            converted['thickness'] = dimensions['thickness'] / 10  # mm to cm
-        else:
-            converted['thickness'] = dimensions['thickness']  # keep as mm
-
-    # Handle length and width
-    dimension_unit = units.get('dimensions', 'mm')
-    for field in ['length', 'width']:
-        if field in dimensions:
-            if dimension_unit == 'cm':
-                converted[field] = dimensions[field] / 10  # mm to cm
-            else:
-                converted[field] = dimensions[field]  # keep as mm
+        value = dimensions['thickness']
+        converted['thickness'] = value / thickness_div if thickness_div else value
+    converted.update(
+        (field, dimensions[field] / dimension_div if dimension_div else dimensions[field])
+        for field in ('length', 'width')
+        if field in dimensions
+    )
 
     return converted
 
@@ -38,60 +222,42 @@ async def _collect_price_elements(self, page) -> List[Dict]:
         '.price-wrapper'
     ]
 
-    for selector in selectors:
+    # Eén evaluate voor alle selectors: elk element één keer (dedup op identiteit),
+    # met id en tekst direct uit de DOM i.p.v. een round-trip per element
+    try:
+        candidates = await page.evaluate(_COLLECT_TEXT_JS, selectors)
+    except Exception as e:
+        logger.warning("Error bij verzamelen van prijselementen: %s", e)
+        return prices
+
+    for candidate in candidates:
         try:
-            elements = await page.query_selector_all(selector)
-            for element in elements:
-                try:
-                    text = await element.text_content()
-                    if not text:
-                        continue
-
-                    text = text.lower().strip()
-
-                    # Zoek naar prijzen met verschillende patronen
-                    price_patterns = [
-                        r'€\s*(\d+(?:[.,]\d{2})?)',  # €20,00
-                        r'(\d+(?:[.,]\d{2})?)\s*€',  # 20,00€
-                        r'eur\s*(\d+(?:[.,]\d{2})?)',  # EUR 20,00
-                        r'(\d+(?:[.,]\d{2})?)\s*eur'   # 20,00 EUR
-                    ]
-
-                    for pattern in price_patterns:
-                        price_matches = re.findall(pattern, text)
-                        if price_matches:
-                            # Neem de laatste match (vaak de meest relevante bij meerdere prijzen)
-                            price_str = price_matches[-1]
-                            price = float(price_str.replace(',', '.'))
-
-                            # Valideer dat de prijs realistisch is
-                            if 0.01 <= price <= 10000.0:  # Verruim de prijsrange
-                                # Check BTW indicatie
-                                is_incl = any(term in text for term in ['incl', 'inclusief', 'inc.', 'incl.'])
-
-                                # Genereer een unieke identifier voor het element
-                                element_id = await element.evaluate("""el => {
-                                    if (el.id) return el.id;
-                                    if (el.className) return el.className;
-                                    return el.tagName + '_' + (el.textContent || '').substring(0, 20);
-                                }""")
-
-                                prices.append({
-                                    'element': element,
-                                    'element_id': element_id,
-                                    'text': text,
-                                    'price': price,
-                                    'is_incl': is_incl,
-                                    'pattern_used': pattern
-                                })
-                                print(f"Gevonden prijs in element {element_id}: €{price:.2f} ({'incl' if is_incl else 'excl'} BTW)")
-                                break  # Stop na eerste geldige prijs in dit element
-
-                except Exception as e:
-                    print(f"Error bij element verwerking: {str(e)}")
-                    continue
+            text = candidate['text']
+
+            # Zoek naar prijzen (één regex voor alle notaties)
+            price_matches = _PRICE_RE.findall(text)
+            if price_matches:
+                # Neem de laatste match (vaak de meest relevante bij meerdere prijzen)
+                price_str = next(g for g in price_matches[-1] if g)
+                price = _fast_price_parse(price_str)
+
+                # Valideer dat de prijs realistisch is
+                if 0.01 <= price <= 10000.0:  # Verruim de prijsrange
+                    # Check BTW indicatie
+                    is_incl = _BTW_INCL_RE.search(text) is not None
+                    element_id = candidate['element_id']
+
+                    prices.append({
+                        'element_id': element_id,
+                        'text': text,
+                        'price': price,
+                        'is_incl': is_incl,
+                        'pattern_used': _PRICE_RE.pattern
+                    })
+                    logger.debug("Gevonden prijs in element %s: €%.2f (%s BTW)", element_id, price, 'incl' if is_incl else 'excl')
+
         except Exception as e:
-            print(f"Error bij selector {selector}: {str(e)}")
+            logger.warning("Error bij element verwerking: %s", e)
             continue
 
     return prices
@@ -101,13 +267,17 @@ def _find_changed_prices(self, initial_prices: List[Dict], updated_prices: List[
     """Vindt prijzen die zijn veranderd na het invullen van dimensies"""
     changed = []
 
-    # Maak maps voor snelle vergelijking
-    initial_by_id = {p['element_id']: p for p in initial_prices if 'element_id' in p}
-    initial_by_text = {p['text']: p for p in initial_prices}
+    # Eén lookup op ('id', element_id) en ('text', text), gevuld in één pass
+    initial_lookup = {}
+    for p in initial_prices:
+        if p.get('element_id'):
+            initial_lookup[('id', p['element_id'])] = p
+        initial_lookup[('text', p['text'])] = p
 
-    print("\nVergelijken van prijzen:")
-    print(f"Initiële prijzen: {len(initial_prices)}")
-    print(f"Nieuwe prijzen: {len(updated_prices)}")
+    # Kandidaten voor de fallback, verzameld in dezelfde loop
+    fallback = []
+
+    logger.debug("Vergelijken van prijzen: %d initieel, %d nieuw", len(initial_prices), len(updated_prices))
 
     # Check welke prijzen zijn veranderd of nieuw zijn
     for price_info in updated_prices:
@@ -115,101 +285,71 @@ def _find_changed_prices(self, initial_prices: List[Dict], updated_prices: List[
         text = price_info['text']
         price = price_info['price']
 
-        # Probeer eerst te matchen op element ID
-        if element_id and element_id in initial_by_id:
-            initial_price = initial_by_id[element_id]['price']
-            if abs(initial_price - price) > 0.01:  # Gebruik kleine marge voor float vergelijking
-                print(f"\nPrijsverandering gedetecteerd in element {element_id}:")
-                print(f"- Oude prijs: €{initial_price:.2f}")
-                print(f"- Nieuwe prijs: €{price:.2f}")
-                changed.append(price_info)
-        # Als geen ID match, probeer op tekst
-        elif text in initial_by_text:
-            initial_price = initial_by_text[text]['price']
-            if abs(initial_price - price) > 0.01:
-                print(f"\nPrijsverandering gedetecteerd in tekst '{text}':")
-                print(f"- Oude prijs: €{initial_price:.2f}")
-                print(f"- Nieuwe prijs: €{price:.2f}")
+        if 5.0 <= price <= 500.0 and _FALLBACK_TERM_RE.search(text):  # Typische m² prijsrange
+            fallback.append(price_info)
+
+        # Probeer eerst te matchen op element ID, anders op tekst
+        match_key = ('id', element_id)
+        initial = initial_lookup.get(match_key) if element_id else None
+        if initial is None:
+            match_key = ('text', text)
+            initial = initial_lookup.get(match_key)
+
+        if initial is not None:
+            initial_price = initial['price']
+            if not math.isclose(initial_price, price, rel_tol=1e-4, abs_tol=0.005):  # Relatieve + absolute marge
+                logger.debug("Prijsverandering gedetecteerd (%s %s): €%.2f -> €%.2f", *match_key, initial_price, price)
                 changed.append(price_info)
         # Volledig nieuwe prijs
         else:
             # Valideer dat het echt een prijs is
-            if any(indicator in text.lower() for indicator in ['€', 'eur', 'prijs', 'price', 'total', 'bedrag']):
-                print(f"\nNieuwe prijs gevonden: €{price:.2f}")
-                print(f"In element: {element_id if element_id else text}")
+            if _PRICE_INDICATOR_RE.search(text):
+                logger.debug("Nieuwe prijs gevonden: €%.2f in element %s", price, element_id or text)
                 changed.append(price_info)
 
     if not changed:
-        print("\nGeen prijsveranderingen gedetecteerd")
+        logger.debug("Geen prijsveranderingen gedetecteerd")
         # Als er geen veranderingen zijn, kijk naar nieuwe prijzen die mogelijk relevant zijn
-        for price_info in updated_prices:
-            if 5.0 <= price_info['price'] <= 500.0:  # Typische m² prijsrange
-                if any(term in price_info['text'].lower() for term in ['totaal', 'total', 'prijs', 'price']):
-                    print(f"\nMogelijk relevante prijs gevonden: €{price_info['price']:.2f}")
-                    print(f"In element: {price_info.get('element_id', price_info['text'])}")
-                    changed.append(price_info)
+        for price_info in fallback:
+            logger.debug("Mogelijk relevante prijs gevonden: €%.2f in element %s", price_info['price'], price_info.get('element_id', price_info['text']))
+            changed.append(price_info)
 
     return changed
 
 
+async def _ensure_captcha_script(self, page, script):
+    """Registreer één captcha-functie één keer per pagina, los van de andere"""
+    loaded = getattr(page, '_opg_scripts_loaded', None)
+    if loaded is None:
+        loaded = page._opg_scripts_loaded = set()
+    if script in loaded:
+        return
+    # Eerst evalueren: een fout in dit script komt zo bij de aanroeper terecht
+    await page.evaluate(script)
+    # Init script zodat de functie ook na navigatie beschikbaar blijft
+    await page.add_init_script(script)
+    loaded.add(script)
+
+
 async def _extract_recaptcha_key(self, page):
     """Extract reCAPTCHA site key from the page"""
     try:
-        # Try multiple methods to extract the site key
-        site_key = await page.evaluate("""
-            () => {
-                // Method 1: Look for g-recaptcha elements with data-sitekey
-                const recaptchaElements = document.querySelectorAll('.g-recaptcha[data-sitekey], [class*=recaptcha][data-sitekey]');
-                if (recaptchaElements.length > 0) {
-                    return recaptchaElements[0].getAttribute('data-sitekey');
-                }
-
-                // Method 2: Look for grecaptcha in window object and try to extract key
-                if (window.grecaptcha && window.grecaptcha.render) {
-                    // This is more complex as it's in the rendered parameters
-                    const recaptchaDiv = document.querySelector('.g-recaptcha');
-                    if (recaptchaDiv) {
-                        return recaptchaDiv.getAttribute('data-sitekey');
-                    }
-                }
-
-                // Method 3: Look in the page source
-                const scripts = document.querySelectorAll('script');
-                for (const script of scripts) {
-                    const text = script.textContent || script.innerText || '';
-                    const match = text.match(/('sitekey'|"sitekey"|sitekey)(\s*):(\s*)(['"`])((\\.|[^\\])*?)\4/i);
-                    if (match && match[5]) {
-                        return match[5];
-                    }
-                }
-
-                // Method 4: Search in script src attributes
-                for (const script of scripts) {
-                    const src = script.getAttribute('src') || '';
-                    if (src.includes('recaptcha')) {
-                        const match = src.match(/[?&]k=([^&]+)/i);
-                        if (match && match[1]) {
-                            return match[1];
-                        }
-                    }
-                }
+        # Site keys are static per shop, so reuse a key found earlier on the same host
+        cache = getattr(self, '_site_key_cache', None)
+        if cache is None:
+            cache = self._site_key_cache = {}
+        host = urlparse(page.url).hostname
+        if host in cache:
+            return cache[host]
 
-                // Method 5: Look for recaptcha iframe and extract from src
-                const recaptchaIframes = document.querySelectorAll('iframe[src*="recaptcha"]');
-                for (const iframe of recaptchaIframes) {
-                    const src = iframe.getAttribute('src') || '';
-                    const match = src.match(/[?&]k=([^&]+)/i);
-                    if (match && match[1]) {
-                        return match[1];
-                    }
-                }
-
-                return null;
-            }
-        """)
+        # Try multiple methods to extract the site key
+        await _ensure_captcha_script(self, page, _CAPTCHA_EXTRACT_JS)
+        site_key = await page.evaluate("window.__opgExtractKey()")
 
         if site_key:
             self._update_status(f"Found reCAPTCHA site key: {site_key}", "captcha")
+            if host:
+                cache[host] = site_key
             return site_key
 
         self._update_status("Could not find reCAPTCHA site key with JavaScript", "warn")
@@ -220,146 +360,150 @@ async def _extract_recaptcha_key(self, page):
         return None
 
 
+class _CaptchaServiceError(Exception):
+    """Error reported by an external captcha service"""
+
+
+class _TwoCaptchaHandler:
+    """2Captcha: GET API with in.php/res.php"""
+
+    def __init__(self, endpoints):
+        self.endpoints = endpoints
+
+    async def submit(self, session, api_key, site_key, page_url):
+        """Submit the task and return its ID"""
+        params = {
+            'key': api_key,
+            'method': 'userrecaptcha',
+            'googlekey': site_key,
+            'pageurl': page_url,
+            'json': 1
+        }
+        async with session.get(self.endpoints['submit'], params=params) as response:
+            result = await response.json()
+        if result.get('status') != 1:
+            raise _CaptchaServiceError(result.get('error_text', 'Unknown error'))
+        return result.get('request')
+
+    async def poll(self, session, api_key, task_id):
+        """Return (ready, solution) for the task"""
+        params = {
+            'key': api_key,
+            'action': 'get',
+            'id': task_id,
+            'json': 1
+        }
+        async with session.get(self.endpoints['retrieve'], params=params) as response:
+            result = await response.json()
+        if result.get('status') == 1:
+            return True, result.get('request')
+        if result.get('request') != 'CAPCHA_NOT_READY':
+            raise _CaptchaServiceError(result.get('request', 'Unknown error'))
+        return False, None
+
+
+class _TaskApiHandler:
+    """Anti-Captcha/CapMonster: createTask/getTaskResult with NoCaptchaTaskProxyless"""
+
+    def __init__(self, endpoints, error_field):
+        self.endpoints = endpoints
+        # Anti-Captcha reports errorDescription, CapMonster errorCode
+        self.error_field = error_field
+
+    async def submit(self, session, api_key, site_key, page_url):
+        """Submit the task and return its ID"""
+        data = {
+            'clientKey': api_key,
+            'task': {
+                'type': 'NoCaptchaTaskProxyless',
+                'websiteURL': page_url,
+                'websiteKey': site_key
+            }
+        }
+        async with session.post(self.endpoints['submit'], json=data) as response:
+            result = await response.json()
+        if result.get('errorId') != 0:
+            raise _CaptchaServiceError(result.get(self.error_field, 'Unknown error'))
+        return result.get('taskId')
+
+    async def poll(self, session, api_key, task_id):
+        """Return (ready, solution) for the task"""
+        data = {
+            'clientKey': api_key,
+            'taskId': task_id
+        }
+        async with session.post(self.endpoints['retrieve'], json=data) as response:
+            result = await response.json()
+        if result.get('errorId') != 0:
+            raise _CaptchaServiceError(result.get(self.error_field, 'Unknown error'))
+        if result.get('status') == 'ready':
+            return True, result.get('solution', {}).get('gRecaptchaResponse')
+        return False, None
+
+
+_CAPTCHA_HANDLERS = MappingProxyType({
+    '2Captcha': _TwoCaptchaHandler(_CAPTCHA_ENDPOINTS['2Captcha']),
+    'Anti-Captcha': _TaskApiHandler(_CAPTCHA_ENDPOINTS['Anti-Captcha'], 'errorDescription'),
+    'CapMonster': _TaskApiHandler(_CAPTCHA_ENDPOINTS['CapMonster'], 'errorCode'),
+})
+
+
+async def _get_captcha_session(self):
+    """Lazily create the aiohttp session used for external captcha services
+
+    The session lives on the owner and is closed by PriceCalculator.close().
+    """
+    session = getattr(self, '_captcha_session', None)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(connector=aiohttp.TCPConnector(limit=10, ttl_dns_cache=300))
+        self._captcha_session = session
+    return session
+
+
 async def _solve_captcha_with_external_service(self, service_name, api_key, site_key, page_url, captcha_type, max_wait_time):
     """Solve captcha using an external service"""
     try:
-        import aiohttp
-        import json
-        import time
-
         start_time = time.time()
         self._update_status(f"Starting captcha solution request with {service_name}", "captcha")
 
-        # API endpoints for different services
-        service_endpoints = {
-            '2Captcha': {
-                'submit': 'https://2captcha.com/in.php',
-                'retrieve': 'https://2captcha.com/res.php'
-            },
-            'Anti-Captcha': {
-                'submit': 'https://api.anti-captcha.com/createTask',
-                'retrieve': 'https://api.anti-captcha.com/getTaskResult'
-            },
-            'CapMonster': {
-                'submit': 'https://api.capmonster.cloud/createTask',
-                'retrieve': 'https://api.capmonster.cloud/getTaskResult'
-            }
-        }
-
-        if service_name not in service_endpoints:
+        handler = _CAPTCHA_HANDLERS.get(service_name)
+        if handler is None:
             self._update_status(f"Unknown captcha service: {service_name}", "error")
             return None
 
-        # Prepare the request data
-        task_data = None
-        task_id = None
-
-        # Using aiohttp for non-blocking HTTP requests
-        async with aiohttp.ClientSession() as session:
-            # Submit the captcha task
-            if service_name == '2Captcha':
-                # 2Captcha API
-                params = {
-                    'key': api_key,
-                    'method': 'userrecaptcha',
-                    'googlekey': site_key,
-                    'pageurl': page_url,
-                    'json': 1
-                }
-                async with session.get(service_endpoints[service_name]['submit'], params=params) as response:
-                    result = await response.json()
-                    if result.get('status') == 1:
-                        task_id = result.get('request')
-                    else:
-                        self._update_status(f"Error from {service_name}: {result.get('error_text', 'Unknown error')}", "error")
-                        return None
-            else:
-                # Anti-Captcha/CapMonster API
-                data = {
-                    'clientKey': api_key,
-                    'task': {
-                        'type': 'NoCaptchaTaskProxyless',
-                        'websiteURL': page_url,
-                        'websiteKey': site_key
-                    }
-                }
-                async with session.post(service_endpoints[service_name]['submit'], json=data) as response:
-                    result = await response.json()
-                    if service_name == 'Anti-Captcha':
-                        if result.get('errorId') == 0:
-                            task_id = result.get('taskId')
-                        else:
-                            self._update_status(f"Error from {service_name}: {result.get('errorDescription', 'Unknown error')}", "error")
-                            return None
-                    else:  # CapMonster
-                        if result.get('errorId') == 0:
-                            task_id = result.get('taskId')
-                        else:
-                            self._update_status(f"Error from {service_name}: {result.get('errorCode', 'Unknown error')}", "error")
-                            return None
-
-            # If we have a task ID, poll for results
-            if task_id:
-                self._update_status(f"Captcha task submitted, waiting for solution (task ID: {task_id})", "captcha")
-                # Poll with increasing delays
-                wait_time = 5  # Start with 5 seconds
-
-                while time.time() - start_time < max_wait_time:
-                    # Wait before polling
-                    await asyncio.sleep(wait_time)
-
-                    # Adjust wait time for next poll
-                    wait_time = min(wait_time * 1.5, 15)  # Increase wait time but cap at 15 seconds
-
-                    self._update_status(f"Checking captcha solution status (elapsed: {int(time.time() - start_time)}s)", "captcha")
-
-                    # Poll for results
-                    if service_name == '2Captcha':
-                        params = {
-                            'key': api_key,
-                            'action': 'get',
-                            'id': task_id,
-                            'json': 1
-                        }
-                        async with session.get(service_endpoints[service_name]['retrieve'], params=params) as response:
-                            result = await response.json()
-                            if result.get('status') == 1:
-                                # We have a solution
-                                solution = result.get('request')
-                                self._update_status(f"Captcha solved successfully in {int(time.time() - start_time)}s", "captcha", {"status": "success"})
-                                return solution
-                            elif result.get('request') != 'CAPCHA_NOT_READY':
-                                # Some error occurred
-                                self._update_status(f"Error from {service_name}: {result.get('request', 'Unknown error')}", "error")
-                                return None
-                    else:
-                        # Anti-Captcha/CapMonster API
-                        data = {
-                            'clientKey': api_key,
-                            'taskId': task_id
-                        }
-                        async with session.post(service_endpoints[service_name]['retrieve'], json=data) as response:
-                            result = await response.json()
-                            if result.get('errorId') == 0 and result.get('status') == 'ready':
-                                # We have a solution
-                                solution = result.get('solution', {}).get('gRecaptchaResponse')
-                                self._update_status(f"Captcha solved successfully in {int(time.time() - start_time)}s", "captcha", {"status": "success"})
-                                return solution
-                            elif result.get('errorId') != 0:
-                                # Some error occurred
-                                error_msg = result.get('errorDescription', 'Unknown error')
-                                if service_name == 'CapMonster':
-                                    error_msg = result.get('errorCode', 'Unknown error')
-                                self._update_status(f"Error from {service_name}: {error_msg}", "error")
-                                return None
-
-                # If we get here, we've timed out
-                self._update_status(f"Timed out waiting for captcha solution after {max_wait_time}s", "error")
-                return None
-            else:
-                self._update_status("Failed to submit captcha task", "error")
-                return None
+        # Shared session so submits/polls of all solves reuse keep-alive connections
+        session = await _get_captcha_session(self)
+
+        # Submit the captcha task
+        task_id = await handler.submit(session, api_key, site_key, page_url)
+        if not task_id:
+            self._update_status("Failed to submit captcha task", "error")
+            return None
 
+        self._update_status(f"Captcha task submitted, waiting for solution (task ID: {task_id})", "captcha")
+        # First poll after the typical minimum solve time, then poll on a short fixed interval
+        await asyncio.sleep(min(_CAPTCHA_FIRST_POLL_DELAY, max_wait_time))
+
+        while time.time() - start_time < max_wait_time:
+            poll_started = time.time()
+
+            self._update_status(f"Checking captcha solution status (elapsed: {int(time.time() - start_time)}s)", "captcha")
+
+            ready, solution = await handler.poll(session, api_key, task_id)
+            if ready:
+                self._update_status(f"Captcha solved successfully in {int(time.time() - start_time)}s", "captcha", {"status": "success"})
+                return solution
+
+            # The interval counts from the start of the poll, so the request RTT is not added on top
+            await asyncio.sleep(max(0.0, _CAPTCHA_POLL_INTERVAL - (time.time() - poll_started)))
+
+        # If we get here, we've timed out
+        self._update_status(f"Timed out waiting for captcha solution after {max_wait_time}s", "error")
+        return None
+
+    except _CaptchaServiceError as e:
+        self._update_status(f"Error from {service_name}: {str(e)}", "error")
+        return None
     except Exception as e:
         self._update_status(f"Error using external captcha service: {str(e)}", "error")
         return None
@@ -369,73 +513,10 @@ async def _apply_captcha_solution(self, page, solution, captcha_type):
     """Apply the captcha solution to the page"""
     if captcha_type == 'recaptcha_v2':
         try:
-            # Set the g-recaptcha-response textarea
-            await page.evaluate(f"""
-                (solution) => {{
-                    // Create a textarea or find existing one if the challenge is active
-                    const existing = document.querySelector('textarea#g-recaptcha-response');
-
-                    if (existing) {{
-                        // If the textarea already exists, just set its value
-                        existing.value = solution;
-                    }} else {{
-                        // Create a new textarea if needed
-                        const textarea = document.createElement('textarea');
-                        textarea.id = 'g-recaptcha-response';
-                        textarea.name = 'g-recaptcha-response';
-                        textarea.className = 'g-recaptcha-response';
-                        textarea.style.display = 'none';
-                        textarea.value = solution;
-                        document.body.appendChild(textarea);
-                    }}
-
-                    // Trigger events to make the site recognize the solved captcha
-                    document.dispatchEvent(new Event('captcha-solution'));
-
-                    // Try to trigger success callbacks
-                    if (window.___grecaptcha_cfg && window.___grecaptcha_cfg.clients) {{
-                        const clients = Object.values(window.___grecaptcha_cfg.clients);
-                        for (const client of clients) {{
-                            try {{
-                                // Different versions of reCAPTCHA have different structures
-                                // Try to find and call the callback
-                                if (client && client.iY) {{
-                                    const callback = client.iY.callback;
-                                    if (typeof callback === 'function') {{
-                                        callback(solution);
-                                    }}
-                                }}
-                            }} catch (e) {{
-                                console.error('Error triggering reCAPTCHA callback:', e);
-                            }}
-                        }}
-                    }}
-
-                    return true;
-                }}
-            """, solution)
-
-            # Wait a moment for any callbacks to execute
-            await asyncio.sleep(2.0)
-
-            # Try to find and click any submit buttons that might have been enabled
-            await page.evaluate("""
-                () => {
-                    // Look for newly enabled submit buttons
-                    const buttons = document.querySelectorAll('button:not([disabled]), input[type="submit"]:not([disabled])');
-                    for (const button of buttons) {
-                        // Check if it's visible
-                        const style = window.getComputedStyle(button);
-                        if (style.display !== 'none' && style.visibility !== 'hidden' && style.opacity !== '0') {
-                            // Might be a submit button that was enabled after solving captcha
-                            // Don't click automatically, as it might submit a form before all fields are filled
-                            // Just return that we found an enabled button
-                            return true;
-                        }
-                    }
-                    return false;
-                }
-            """)
+            # Set the g-recaptcha-response textarea, wait for callbacks and scan for
+            # enabled submit buttons in one round-trip (the wait runs browser-side)
+            await _ensure_captcha_script(self, page, _CAPTCHA_APPLY_JS)
+            await page.evaluate("sol => window.__opgApplyCaptcha(sol)", solution)
 
             return True
         except Exception as e:
@@ -0,0 +1,46 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+# Cached configuration reads expire after this many seconds, even without a write
+DEFAULT_TTL = 300
+
+# Upper bound on cached values; the least recently used entry is evicted first
+MAX_ENTRIES = 1024
+
+# (namespace, key) -> (expires_at, value), ordered from least to most recently used
+_entries: OrderedDict = OrderedDict()
+
+# Reads also run in worker threads (asyncio.to_thread); the loader itself runs outside the lock
+_lock = threading.Lock()
+
+def get_or_load(namespace: str, key: Hashable, loader: Callable[[], Any], ttl: float = DEFAULT_TTL) -> Any:
+    """Return the cached value for (namespace, key), calling loader on a miss or expiry"""
+    now = time.monotonic()
+    with _lock:
+        entry = _entries.get((namespace, key))
+        if entry is not None and entry[0] > now:
+            _entries.move_to_end((namespace, key))
+            return entry[1]
+
+    value = loader()
+    # Misses are not cached so unknown keys can't grow the cache
+    if value is not None:
+        with _lock:
+            _entries[(namespace, key)] = (now + ttl, value)
+            _entries.move_to_end((namespace, key))
+            if len(_entries) > MAX_ENTRIES:
+                _entries.popitem(last=False)
+    return value
+
+def invalidate(namespace: Optional[str] = None, key: Optional[Hashable] = None):
+    """Drop one cached value, a whole namespace, or everything when called without arguments"""
+    with _lock:
+        if namespace is None:
+            _entries.clear()
+        elif key is not None:
+            _entries.pop((namespace, key), None)
+        else:
+            for cache_key in [k for k in _entries if k[0] == namespace]:
+                del _entries[cache_key]
@@ -1,76 +1,111 @@
-import json
+import orjson
 from datetime import datetime, timezone
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
 from app.models.models import DomainConfig, CountryConfig, PackageConfig, ConfigVersion
+import app.services.config_cache as config_cache
+
+def _domain_config_row(config: DomainConfig) -> Dict:
+    return {
+        "domain": config.domain,
+        "config": config.config,
+        "created_at": config.created_at.isoformat() if config.created_at else None,
+        "updated_at": config.updated_at.isoformat() if config.updated_at else None
+    }
+
+def _country_config_row(config: CountryConfig) -> Dict:
+    return {
+        "country_code": config.country_code,
+        "config": config.config,
+        "created_at": config.created_at.isoformat() if config.created_at else None,
+        "updated_at": config.updated_at.isoformat() if config.updated_at else None
+    }
+
+def _package_config_row(config: PackageConfig) -> Dict:
+    return {
+        "package_id": config.package_id,
+        "config": config.config,
+        "created_at": config.created_at.isoformat() if config.created_at else None,
+        "updated_at": config.updated_at.isoformat() if config.updated_at else None
+    }
+
+def _config_version_row(config: ConfigVersion) -> Dict:
+    return {
+        "config_type": config.config_type,
+        "config_id": config.config_id,
+        "config": config.config,
+        "version": config.version,
+        "created_at": config.created_at.isoformat() if config.created_at else None,
+        "comment": config.comment
+    }
+
+# Export sections in file order: (key, model, row converter)
+_EXPORT_SECTIONS = (
+    ("domain_configs", DomainConfig, _domain_config_row),
+    ("country_configs", CountryConfig, _country_config_row),
+    ("package_configs", PackageConfig, _package_config_row),
+    ("config_versions", ConfigVersion, _config_version_row),
+)
 
 def export_configs(db: Session) -> Dict:
     """
     Export all configurations from the database to a dictionary.
     """
-    # Get all configurations
-    domain_configs = db.query(DomainConfig).all()
-    country_configs = db.query(CountryConfig).all()
-    package_configs = db.query(PackageConfig).all()
-    config_versions = db.query(ConfigVersion).all()
-
-    # Convert to dictionaries
-    export_data = {
-        "domain_configs": [
-            {
-                "domain": config.domain,
-                "config": config.config,
-                "created_at": config.created_at.isoformat() if config.created_at else None,
-                "updated_at": config.updated_at.isoformat() if config.updated_at else None
-            }
-            for config in domain_configs
-        ],
-        "country_configs": [
-            {
-                "country_code": config.country_code,
-                "config": config.config,
-                "created_at": config.created_at.isoformat() if config.created_at else None,
-                "updated_at": config.updated_at.isoformat() if config.updated_at else None
-            }
-            for config in country_configs
-        ],
-        "package_configs": [
-            {
-                "package_id": config.package_id,
-                "config": config.config,
-                "created_at": config.created_at.isoformat() if config.created_at else None,
-                "updated_at": config.updated_at.isoformat() if config.updated_at else None
-            }
-            for config in package_configs
-        ],
-        "config_versions": [
-            {
-                "config_type": config.config_type,
-                "config_id": config.config_id,
-                "config": config.config,
-                "version": config.version,
-                "created_at": config.created_at.isoformat() if config.created_at else None,
-                "comment": config.comment
-            }
-            for config in config_versions
-        ]
+    return {
+        key: [to_row(config) for config in db.query(model).all()]
+        for key, model, to_row in _EXPORT_SECTIONS
     }
 
-    return export_data
+def iter_export_json(db: Session, batch_size: int = 500) -> Iterator[str]:
+    """
+    Export all configurations as a JSON document, yielded in chunks.
+
+    Rows are fetched in batches of batch_size and serialized one at a time, so
+    the full export never has to be held in memory.
+    """
+    yield "{"
+    for section_index, (key, model, to_row) in enumerate(_EXPORT_SECTIONS):
+        yield f'{"," if section_index else ""}\n  {orjson.dumps(key).decode()}: ['
+        for row_index, config in enumerate(db.query(model).yield_per(batch_size)):
+            yield f'{"," if row_index else ""}\n    {orjson.dumps(to_row(config)).decode()}'
+        yield "\n  ]"
+    yield "\n}\n"
 
 def save_configs_to_file(export_data: Dict, filename: str = "configs_backup.json"):
     """
     Save the exported configurations to a JSON file.
     """
-    with open(filename, 'w') as f:
-        json.dump(export_data, f, indent=2)
+    with open(filename, 'wb') as f:
+        f.write(orjson.dumps(export_data, option=orjson.OPT_INDENT_2))
 
 def load_configs_from_file(filename: str = "configs_backup.json") -> Dict:
     """
     Load configurations from a JSON file.
     """
-    with open(filename, 'r') as f:
-        return json.load(f)
+    with open(filename, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _upsert_configs(db: Session, key_column, configs: Dict[str, Dict]):
+    """Werk bestaande configs bij en voeg de nieuwe toe met één bulk insert"""
+    if not configs:
+        return
+
+    model = key_column.class_
+    existing = db.query(model).filter(key_column.in_(list(configs))).all()
+    now = datetime.now(timezone.utc)
+    for row in existing:
+        row.config = configs[getattr(row, key_column.key)]
+        row.updated_at = now
+
+    existing_keys = {getattr(row, key_column.key) for row in existing}
+    new_rows = [
+        {key_column.key: key, "config": config}
+        for key, config in configs.items()
+        if key not in existing_keys
+    ]
+    if new_rows:
+        db.execute(insert(model), new_rows)
 
 def import_configs(configs: Dict[str, List[Dict]], db: Session, clear_existing: bool = False):
     """Import configurations from a dictionary containing lists of configs for each type."""
@@ -83,67 +118,32 @@ def import_configs(configs: Dict[str, List[Dict]], db: Session, clear_existing:
             db.commit()
 
         # Process domain configurations
-        for domain_config in configs.get('domain_configs', []):
-            domain = domain_config.get('domain')
-            if domain:
-                # Check if domain exists
-                existing = db.query(DomainConfig).filter(DomainConfig.domain == domain).first()
-                if existing:
-                    # Update existing config
-                    existing.config = domain_config.get('config', {})
-                    existing.updated_at = datetime.now(timezone.utc)
-                else:
-                    # Create new config
-                    new_config = DomainConfig(
-                        domain=domain,
-                        config=domain_config.get('config', {})
-                    )
-                    db.add(new_config)
+        _upsert_configs(db, DomainConfig.domain, {
+            domain_config['domain']: domain_config.get('config', {})
+            for domain_config in configs.get('domain_configs', [])
+            if domain_config.get('domain')
+        })
 
         # Process country configurations
-        for country_config in configs.get('country_configs', []):
-            country_code = country_config.get('country_code')
-            if country_code:
-                # Check if country exists
-                existing = db.query(CountryConfig).filter(CountryConfig.country_code == country_code).first()
-                if existing:
-                    # Update existing config
-                    existing.config = country_config.get('config', {})
-                    existing.updated_at = datetime.now(timezone.utc)
-                else:
-                    # Create new config
-                    new_config = CountryConfig(
-                        country_code=country_code,
-                        config=country_config.get('config', {})
-                    )
-                    db.add(new_config)
+        _upsert_configs(db, CountryConfig.country_code, {
+            country_config['country_code']: country_config.get('config', {})
+            for country_config in configs.get('country_configs', [])
+            if country_config.get('country_code')
+        })
 
         # Process package configurations
+        package_configs = {}
         for package_config in configs.get('package_configs', []):
             # Try to get package_id from either 'id' or 'package_id' field
             package_id = package_config.get('package_id') or package_config.get('id')
             if package_id:
-                # Check if package exists
-                existing = db.query(PackageConfig).filter(PackageConfig.package_id == str(package_id)).first()
-                if existing:
-                    # Update existing config
-                    config_data = package_config.get('config', {})
-                    if not config_data:  # If no config field, use the entire object
-                        config_data = package_config
-                    existing.config = config_data
-                    existing.updated_at = datetime.now(timezone.utc)
-                else:
-                    # Create new config
-                    config_data = package_config.get('config', {})
-                    if not config_data:  # If no config field, use the entire object
-                        config_data = package_config
-                    new_config = PackageConfig(
-                        package_id=str(package_id),
-                        config=config_data
-                    )
-                    db.add(new_config)
+                # If no config field, use the entire object
+                package_configs[str(package_id)] = package_config.get('config', {}) or package_config
+        _upsert_configs(db, PackageConfig.package_id, package_configs)
 
         db.commit()
+        # Alle gecachte configuraties zijn mogelijk gewijzigd
+        config_cache.invalidate()
         return True
     except Exception as e:
         db.rollback()
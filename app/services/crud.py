@@ -1,15 +1,72 @@
+import logging
+from typing import NamedTuple
+from sqlalchemy import bindparam, func, literal, select, union_all
 from sqlalchemy.orm import Session
 from sqlalchemy.exc import IntegrityError
 import app.models.models as models
 import app.schemas.schemas as schemas
+import app.services.config_cache as config_cache
+
+logger = logging.getLogger(__name__)
+
+# Lookup statements built once so every call reuses the engine's compiled cache
+_domain_config_by_domain = select(models.DomainConfig).where(models.DomainConfig.domain == bindparam('domain'))
+_country_config_by_code = select(models.CountryConfig).where(models.CountryConfig.country_code == bindparam('country_code'))
+_package_config_by_id = select(models.PackageConfig).where(models.PackageConfig.package_id == bindparam('package_id'))
+_config_versions_latest_first = select(models.ConfigVersion).where(
+    models.ConfigVersion.config_type == bindparam('config_type'),
+    models.ConfigVersion.config_id == bindparam('config_id')
+).order_by(models.ConfigVersion.version.desc())
+
+def _get_by_natural_key(db: Session, stmt, param: str, value: str):
+    """Zoek een config op via de unieke sleutel, met een cache per sessie
+
+    De primary key is een integer id, dus session.get() kan niet op domein,
+    landcode of pakket id zoeken. Deze cache in db.info geeft hetzelfde effect
+    als de identity map: een herhaalde lookup binnen een sessie raakt de DB niet.
+    """
+    cache = db.info.setdefault('natural_key_cache', {})
+    cache_key = (param, value)
+    db_config = cache.get(cache_key)
+    if db_config is not None and db_config in db:
+        return db_config
+
+    db_config = db.scalars(stmt, {param: value}).first()
+    if db_config is not None:
+        cache[cache_key] = db_config
+    return db_config
+
+def _config_data(db_config):
+    return db_config.config if db_config else None
 
 # Domain Config operations
 def get_domain_config(db: Session, domain: str):
-    return db.query(models.DomainConfig).filter(models.DomainConfig.domain == domain).first()
+    return _get_by_natural_key(db, _domain_config_by_domain, 'domain', domain)
+
+def get_cached_domain_config(db: Session, domain: str):
+    """Haal de config dict van een domein op, uit de cache indien mogelijk"""
+    return config_cache.get_or_load('domain', domain, lambda: _config_data(get_domain_config(db, domain)))
 
 def get_domain_configs(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.DomainConfig).offset(skip).limit(limit).all()
 
+def get_cached_domain_configs(db: Session):
+    """Haal alle domein configs op als dict, uit de cache indien mogelijk"""
+    return config_cache.get_or_load('domain', '*', lambda: get_all_configs(db, 'domain')['domain'])
+
+def _group_domains_by_extension(domain_configs: dict):
+    domains_by_extension = {}
+    for domain, config in domain_configs.items():
+        # Extract extension (like .nl, .com, .de, etc); domains without one go under 'other'
+        parts = domain.split('.')
+        extension = '.' + parts[-1] if len(parts) > 1 else 'other'
+        domains_by_extension.setdefault(extension, []).append((domain, config))
+    return domains_by_extension
+
+def get_domains_by_extension(db: Session):
+    """Domeinen gegroepeerd per extensie als (domain, config) lijsten, opnieuw opgebouwd na een wijziging"""
+    return config_cache.get_or_load('domain', '*by_extension', lambda: _group_domains_by_extension(get_cached_domain_configs(db)))
+
 def create_domain_config(db: Session, config: schemas.DomainConfigCreate):
     db_config = models.DomainConfig(**config.dict())
     try:
@@ -18,34 +75,65 @@ def create_domain_config(db: Session, config: schemas.DomainConfigCreate):
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'domain', config.domain, config.config)
+        _invalidate_cached_config('domain', config.domain)
         return db_config
     except IntegrityError:
         db.rollback()
         # Update bestaande config
-        db_config = db.query(models.DomainConfig).filter(models.DomainConfig.domain == config.domain).first()
+        db_config = get_domain_config(db, config.domain)
         for key, value in config.dict().items():
             setattr(db_config, key, value)
         db.commit()
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'domain', config.domain, config.config)
+        _invalidate_cached_config('domain', config.domain)
         return db_config
 
 def delete_domain_config(db: Session, domain: str):
-    db_config = db.query(models.DomainConfig).filter(models.DomainConfig.domain == domain).first()
+    db_config = get_domain_config(db, domain)
     if db_config:
         db.delete(db_config)
         db.commit()
+        _invalidate_cached_config('domain', domain)
         return True
     return False
 
 # Country Config operations
 def get_country_config(db: Session, country_code: str):
-    return db.query(models.CountryConfig).filter(models.CountryConfig.country_code == country_code).first()
+    return _get_by_natural_key(db, _country_config_by_code, 'country_code', country_code)
+
+def get_cached_country_config(db: Session, country_code: str):
+    """Haal de config dict van een land op, uit de cache indien mogelijk"""
+    return config_cache.get_or_load('country', country_code, lambda: _config_data(get_country_config(db, country_code)))
 
 def get_country_configs(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.CountryConfig).offset(skip).limit(limit).all()
 
+class CountryMeta(NamedTuple):
+    currency: str
+    currency_symbol: str
+    vat_rate: float
+
+def _load_country_meta(db: Session):
+    country_meta = {}
+    for row in db.query(models.CountryConfig).all():
+        config = row.config or {}
+        try:
+            country_meta[row.country_code] = CountryMeta(config['currency'], config['currency_symbol'], config['vat_rate'])
+        except KeyError as e:
+            # Eén onvolledige config mag de andere landen niet blokkeren
+            logger.warning("Skipping country config %s: missing %s", row.country_code, e)
+    return country_meta
+
+def get_country_meta(db: Session, country_code: str, fallback: str = 'nl') -> CountryMeta:
+    """Valuta en BTW van een land, met NL als fallback; alle landen worden in één keer gecached"""
+    country_meta = config_cache.get_or_load('country', '*', lambda: _load_country_meta(db))
+    meta = country_meta.get(country_code) or country_meta.get(fallback)
+    if meta is None:
+        raise ValueError(f"No complete country configuration found for {country_code} or fallback {fallback}")
+    return meta
+
 def create_country_config(db: Session, config: schemas.CountryConfigCreate):
     db_config = models.CountryConfig(**config.dict())
     try:
@@ -54,34 +142,45 @@ def create_country_config(db: Session, config: schemas.CountryConfigCreate):
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'country', config.country_code, config.config)
+        _invalidate_cached_config('country', config.country_code)
         return db_config
     except IntegrityError:
         db.rollback()
         # Update bestaande config
-        db_config = db.query(models.CountryConfig).filter(models.CountryConfig.country_code == config.country_code).first()
+        db_config = get_country_config(db, config.country_code)
         for key, value in config.dict().items():
             setattr(db_config, key, value)
         db.commit()
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'country', config.country_code, config.config)
+        _invalidate_cached_config('country', config.country_code)
         return db_config
 
 def delete_country_config(db: Session, country_code: str):
-    db_config = db.query(models.CountryConfig).filter(models.CountryConfig.country_code == country_code).first()
+    db_config = get_country_config(db, country_code)
     if db_config:
         db.delete(db_config)
         db.commit()
+        _invalidate_cached_config('country', country_code)
         return True
     return False
 
 # Package Config operations
 def get_package_config(db: Session, package_id: str):
-    return db.query(models.PackageConfig).filter(models.PackageConfig.package_id == package_id).first()
+    return _get_by_natural_key(db, _package_config_by_id, 'package_id', package_id)
 
 def get_package_configs(db: Session, skip: int = 0, limit: int = 100):
     return db.query(models.PackageConfig).offset(skip).limit(limit).all()
 
+def get_cached_package_config(db: Session, package_id: str):
+    """Haal de config dict van een pakket op, uit de cache indien mogelijk"""
+    return config_cache.get_or_load('package', package_id, lambda: _config_data(get_package_config(db, package_id)))
+
+def get_cached_package_configs(db: Session):
+    """Haal alle pakket configs op als dict, uit de cache indien mogelijk"""
+    return config_cache.get_or_load('package', '*', lambda: {config.package_id: config.config for config in get_package_configs(db)})
+
 def create_package_config(db: Session, config: schemas.PackageConfigCreate):
     db_config = models.PackageConfig(**config.dict())
     try:
@@ -90,35 +189,73 @@ def create_package_config(db: Session, config: schemas.PackageConfigCreate):
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'package', config.package_id, config.config)
+        _invalidate_cached_config('package', config.package_id)
         return db_config
     except IntegrityError:
         db.rollback()
         # Update bestaande config
-        db_config = db.query(models.PackageConfig).filter(models.PackageConfig.package_id == config.package_id).first()
+        db_config = get_package_config(db, config.package_id)
         for key, value in config.dict().items():
             setattr(db_config, key, value)
         db.commit()
         db.refresh(db_config)
         # Sla versie op
         save_config_version(db, 'package', config.package_id, config.config)
+        _invalidate_cached_config('package', config.package_id)
         return db_config
 
 def delete_package_config(db: Session, package_id: str):
-    db_config = db.query(models.PackageConfig).filter(models.PackageConfig.package_id == package_id).first()
+    db_config = get_package_config(db, package_id)
     if db_config:
         db.delete(db_config)
         db.commit()
+        _invalidate_cached_config('package', package_id)
         return True
     return False
 
+# Config type -> (model, natural key column), used to fetch several tables at once
+_CONFIG_TABLES = {
+    'domain': (models.DomainConfig, models.DomainConfig.domain),
+    'country': (models.CountryConfig, models.CountryConfig.country_code),
+    'package': (models.PackageConfig, models.PackageConfig.package_id),
+}
+
+def get_all_configs(db: Session, *config_types: str):
+    """Haal de configs van meerdere types op in één query (UNION ALL)
+
+    Geeft een dict per type terug, bijv. {'domain': {domain: config}, ...}.
+    Zonder argumenten worden alle types opgehaald.
+    """
+    config_types = config_types or tuple(_CONFIG_TABLES)
+    stmt = union_all(*(
+        select(literal(config_type).label('config_type'), key.label('config_key'), model.config)
+        for config_type in config_types
+        for model, key in (_CONFIG_TABLES[config_type],)
+    ))
+    configs = {config_type: {} for config_type in config_types}
+    for config_type, config_key, config in db.execute(stmt):
+        configs[config_type][config_key] = config
+    return configs
+
+# Cache keys die van alle configs van een type afhangen
+_AGGREGATE_CACHE_KEYS = {
+    'domain': ('*', '*by_extension'),
+    'country': ('*',),
+    'package': ('*',),
+}
+
+def _invalidate_cached_config(config_type: str, config_id: str):
+    """Verwijder een gewijzigde configuratie uit de cache"""
+    config_cache.invalidate(config_type, config_id)
+    # De gecachte verzamelingen van dit type zijn ook verouderd
+    for key in _AGGREGATE_CACHE_KEYS[config_type]:
+        config_cache.invalidate(config_type, key)
+
 def save_config_version(db: Session, config_type: str, config_id: str, config: dict, comment: str = None):
     """Sla een nieuwe versie op van een configuratie en behoud maximaal 5 versies"""
 
     # Haal bestaande versies op
-    existing_versions = db.query(models.ConfigVersion).filter(
-        models.ConfigVersion.config_type == config_type,
-        models.ConfigVersion.config_id == config_id
-    ).order_by(models.ConfigVersion.version.desc()).all()
+    existing_versions = db.scalars(_config_versions_latest_first, {'config_type': config_type, 'config_id': config_id}).all()
 
     # Bepaal nieuwe versie nummer
     new_version = 1 if not existing_versions else existing_versions[0].version + 1
@@ -142,10 +279,15 @@ def save_config_version(db: Session, config_type: str, config_id: str, config: d
 
 def get_config_versions(db: Session, config_type: str, config_id: str, skip: int = 0, limit: int = 5):
     """Haal alle versies op van een configuratie"""
-    return db.query(models.ConfigVersion).filter(
+    stmt = _config_versions_latest_first.offset(skip).limit(limit)
+    return db.scalars(stmt, {'config_type': config_type, 'config_id': config_id}).all()
+
+def count_config_versions(db: Session, config_type: str, config_id: str) -> int:
+    """Tel het aantal opgeslagen versies van een configuratie"""
+    return db.scalar(select(func.count()).select_from(models.ConfigVersion).where(
         models.ConfigVersion.config_type == config_type,
         models.ConfigVersion.config_id == config_id
-    ).order_by(models.ConfigVersion.version.desc()).offset(skip).limit(limit).all()
+    ))
 
 def restore_config_version(db: Session, config_type: str, config_id: str, version: int):
     """Herstel een specifieke versie van een configuratie"""
@@ -1,59 +1,410 @@
-from playwright.async_api import async_playwright, Page, expect
+from playwright.async_api import async_playwright, BrowserContext, Page, expect
 from typing import Dict, Any, Optional, Tuple, List, Union
 import logging
 import re
 import os
 import json
 import asyncio
+import time
+from dataclasses import dataclass, field
 from urllib.parse import urlparse
-from datetime import datetime
+from datetime import datetime, timezone
 from app.database.database import SessionLocal
 import app.services.crud as crud
-from app.core.config import HEADLESS
+from app.core.config import HEADLESS, CHROMIUM_CDP_URL
 import random
 import string
+import sys
+from functools import lru_cache
 from twocaptcha import TwoCaptcha
-from app.core.config import Settings
-from app.constants.selectors import LENGTH_SELECTORS, WIDTH_SELECTORS, THICKNESS_SELECTORS, QUANTITY_SELECTORS
+from app.core.settings import Settings
+from app.constants.selectors import DIMENSION_FIELD_PRIORITY, DIMENSION_SELECTOR_FIELDS
+from app.constants import random_values
+
+# Dimensie-variabelen in selectors en step values, bv. "{thickness}"
+_DIMENSION_PLACEHOLDER_RE = re.compile(r'\{(thickness|width|length|quantity)\}')
+
+_USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36'
+
+# Chromium launch args; the canvas/WebGL set is added for domains with disable_canvas_webgl
+_BASE_LAUNCH_ARGS = (
+    '--disable-blink-features=AutomationControlled',
+    '--disable-features=IsolateOrigins,site-per-process',
+    '--disable-application-cache',
+    '--disable-cache',
+    '--disable-offline-load-stale-cache',
+    '--disk-cache-size=0',
+    f'--user-agent={_USER_AGENT}',
+)
+_CANVAS_DISABLE_ARGS = (
+    '--disable-accelerated-2d-canvas',
+    '--disable-webgl',
+    '--disable-gpu',
+    '--disable-software-rasterizer',
+)
+
+# Context with realistic browser settings and empty storage
+_CONTEXT_OPTIONS = {
+    'viewport': {'width': 1920, 'height': 1080},
+    'user_agent': _USER_AGENT,
+    'locale': 'nl-NL',
+    'timezone_id': 'Europe/Amsterdam',
+    'geolocation': {'latitude': 52.3676, 'longitude': 4.9041},  # Amsterdam coordinates
+    'permissions': ['geolocation'],
+    'color_scheme': 'light',
+    'has_touch': True,
+    'is_mobile': False,
+    'device_scale_factor': 2,
+    'java_script_enabled': True,
+    'storage_state': {'cookies': [], 'origins': []},  # Start with empty storage
+    'ignore_https_errors': True,
+    'bypass_csp': True,
+}
+
+# Common browser fingerprints and storage cleanup
+_CONTEXT_INIT_SCRIPT = """
+    Object.defineProperty(navigator, 'webdriver', {
+        get: () => undefined
+    });
+    Object.defineProperty(navigator, 'languages', {
+        get: () => ['nl-NL', 'nl', 'en-US', 'en']
+    });
+    Object.defineProperty(screen, 'colorDepth', {
+        get: () => 24
+    });
+
+    // Clear all storage on page load
+    window.addEventListener('load', () => {
+        localStorage.clear();
+        sessionStorage.clear();
+        if (indexedDB.databases) {
+            indexedDB.databases().then(dbs => dbs.forEach(db => db.name && indexedDB.deleteDatabase(db.name)));
+        }
+    });
+"""
+
+# Prijs in tekst: optionele valuta, getal met optionele scheidingstekens, optionele valuta
+_PRICE_NUMBER_RE = re.compile(r'[€$£¥]?\s*(\d{1,3}(?:[,.]\d{3})*(?:[,.]\d{1,2})?)\s*[€$£¥]?')
+_ANY_NUMBER_RE = re.compile(r'(\d+(?:[,.]\d+)?)')
+_EURO_AMOUNT_RE = re.compile(r'€?\s*(\d+(?:[,.]\d+)?)')
+
+# Getal in een optie/waarde, bv. "2mm" -> 2; een eenheid erachter verandert de match niet
+_DECIMAL_RE = re.compile(r'(\d+(?:\.\d+)?)')
+
+# Splitst een selector in woorden, bv. "#product-thickness_input" -> product, thickness, input
+_SELECTOR_TOKEN_SPLIT_RE = re.compile(r'[\W|\_]+')
+
+# Beschrijft de kandidaten van een select step: tag, type, value en opties (select) of tekst (overig)
+_DESCRIBE_CANDIDATES_JS = """elements => elements.map(el => {
+    const tag = el.tagName.toLowerCase();
+    const type = tag === 'input' ? el.getAttribute('type') : null;
+    const isChoice = type === 'radio' || type === 'checkbox';
+    return {
+        tag,
+        type,
+        value: el.getAttribute('value'),
+        options: tag === 'select'
+            ? Array.from(el.options).map(option => ({value: option.value, text: option.text.trim()}))
+            : [],
+        text: tag === 'select' || isChoice ? '' : el.textContent
+    };
+})"""
+
+# Opties van niet-native dropdowns
+_DROPDOWN_OPTION_SELECTOR = 'li, .option, .dropdown-item, [role="option"]'
+
+# Resolves zodra de DOM quietMs geen mutaties meer heeft gehad, uiterlijk na timeoutMs
+_DOM_SETTLED_JS = """([quietMs, timeoutMs]) => new Promise(resolve => {
+    let timer;
+    const observer = new MutationObserver(() => {
+        clearTimeout(timer);
+        timer = setTimeout(done, quietMs);
+    });
+    const deadline = setTimeout(done, timeoutMs);
+    function done() {
+        observer.disconnect();
+        clearTimeout(timer);
+        clearTimeout(deadline);
+        resolve(true);
+    }
+    observer.observe(document.documentElement, {subtree: true, childList: true, attributes: true, characterData: true});
+    timer = setTimeout(done, quietMs);
+})"""
+
+# Resources die voor een prijsberekening niet nodig zijn. Stylesheets blijven geladen:
+# zichtbaarheid van opties/prijzen en klikbaarheid hangen ervan af.
+_BLOCKED_RESOURCE_TYPES = frozenset({'image', 'media', 'font'})
+_TRACKER_URL_RE = re.compile(
+    r'^https?://[^/]*(google-analytics\.com|googletagmanager\.com|doubleclick\.net|facebook\.net'
+    r'|hotjar\.com|clarity\.ms|bat\.bing\.com)[:/]'
+)
+
+async def _block_unneeded_resources(route):
+    """Route handler: abort images/media/fonts and tracker requests, let the rest through"""
+    request = route.request
+    if request.resource_type in _BLOCKED_RESOURCE_TYPES or _TRACKER_URL_RE.match(request.url):
+        await route.abort()
+    else:
+        await route.continue_()
+
+def _load_calculation_configs(domain: str, country: str):
+    """Domain and country config for one calculation; the session only queries on a cache miss"""
+    db = SessionLocal()
+    try:
+        return crud.get_cached_domain_config(db, domain), crud.get_cached_country_config(db, country)
+    finally:
+        db.close()
+
+# Sentinel voor "geen waarde gevonden" waar None een geldige waarde kan zijn
+_MISSING = object()
+
+@lru_cache(maxsize=512)
+def _classify_dimension(selector: str) -> Optional[str]:
+    """Dimension field a selector refers to (length/width/thickness/quantity), or None"""
+    selector_tokens = {sys.intern(token) for token in _SELECTOR_TOKEN_SPLIT_RE.split(selector.lower())}
+    matched_fields = {DIMENSION_SELECTOR_FIELDS[token] for token in selector_tokens if token in DIMENSION_SELECTOR_FIELDS}
+    return next((field for field in DIMENSION_FIELD_PRIORITY if field in matched_fields), None)
+
+@dataclass
+class _PooledPage:
+    """A page with its own context, kept for reuse on one domain"""
+    context: BrowserContext
+    page: Page
+    key: tuple = ()  # pool key, see PriceCalculator._acquire_page
+    uses: int = 0
+    idle_since: float = 0.0
+    origins: set = field(default_factory=set)  # bezochte http(s) origins, opgeruimd bij release
+
+    def record_origin(self, url: str):
+        """Remember the origin of a navigated frame so its storage can be cleared later"""
+        parsed = urlparse(url)
+        if parsed.scheme in ('http', 'https') and parsed.netloc:
+            self.origins.add(f"{parsed.scheme}://{parsed.netloc}")
+
 
 class PriceCalculator:
     """Calculate prices based on dimensions for different domains"""
 
-    # Class variable to store latest status
-    latest_status = None
+    # Eén queue per verbonden SSE client; bij een volle queue valt de oudste update weg
+    status_subscribers: set = set()
+    STATUS_QUEUE_SIZE = 100
+
+    # step type -> handler method; handlers in _STEPS_WITH_DIMENSIONS also get the dimensions
+    _STEP_HANDLERS = {
+        'select': '_handle_select',
+        'input': '_handle_input',
+        'click': '_handle_click',
+        'wait': '_handle_wait',
+        'blur': '_handle_blur',
+        'modify_element': '_handle_modify',
+        'read_price': '_handle_read_price',
+        'navigate': '_handle_navigate',
+        'reload': '_handle_reload',
+        'captcha': '_handle_captcha',
+        'decide_config': '_handle_decide_config',
+    }
+    _STEPS_WITH_DIMENSIONS = frozenset({'select', 'input', 'click', 'modify_element', 'read_price'})
+
+    # Steps waarvoor eerst een willekeurige muisbeweging wordt gedaan
+    _STEPS_WITH_MOUSE_MOVE = frozenset({'click', 'input', 'select'})
+
+    # Pagina's per domein hergebruiken i.p.v. per berekening een nieuwe context te openen
+    PAGE_POOL_MAX_USES = 50  # daarna wordt de context vervangen
+    PAGE_POOL_MAX_IDLE = 2  # idle pagina's per domein
+    PAGE_POOL_IDLE_TIMEOUT = 300  # seconden
 
     def __init__(self):
         """Initialize the calculator"""
-        self.configs = {}  # Initialize configs dictionary
-        self._load_configs()  # Load configurations from database
+        # Playwright and its browsers are started on first use and shared by all calculations
+        self._playwright = None
+        self._browsers = {}  # disable_canvas_webgl (None bij CHROMIUM_CDP_URL) -> Browser
+        self._browser_lock = asyncio.Lock()
+        self._page_pool = {}  # (domain, disable_canvas_webgl, block_resources) -> idle _PooledPage list
+        self._captcha_session = None  # aiohttp session van de externe captcha services, lazy aangemaakt
         self._update_status("Initializing calculator")
 
-    def _normalize_domain(self, url: str) -> str:
+    @classmethod
+    def subscribe_status(cls) -> asyncio.Queue:
+        """Registreer een SSE client en geef de queue terug waarop zijn status updates binnenkomen"""
+        queue = asyncio.Queue(maxsize=cls.STATUS_QUEUE_SIZE)
+        cls.status_subscribers.add(queue)
+        return queue
+
+    @classmethod
+    def unsubscribe_status(cls, queue: asyncio.Queue):
+        """Meld een SSE client af"""
+        cls.status_subscribers.discard(queue)
+
+    @staticmethod
+    @lru_cache(maxsize=1024)
+    def _normalize_domain(url: str) -> str:
         """Normalize domain name by removing www. and getting base domain"""
         parsed = urlparse(url if url.startswith('http') else f'http://{url}')
         domain = parsed.netloc or parsed.path
         return domain.replace('www.', '')
 
-    def _load_configs(self):
-        """Load configurations from database"""
-        db = SessionLocal()
+    async def _get_browser(self, disable_canvas_webgl: bool):
+        """Return the shared browser for these launch args, (re)launching it when needed"""
+        # Via CDP delen alle calculaties één verbinding met de gedeelde Chromium
+        browser_key = None if CHROMIUM_CDP_URL else disable_canvas_webgl
+        async with self._browser_lock:
+            browser = self._browsers.get(browser_key)
+            if browser is not None and browser.is_connected():
+                return browser
+
+            if self._playwright is None:
+                self._playwright = await async_playwright().start()
+
+            if CHROMIUM_CDP_URL:
+                # Eén Chromium voor alle workers; launch args (ook canvas/webgl) gelden dan voor het hele proces
+                browser = await self._playwright.chromium.connect_over_cdp(CHROMIUM_CDP_URL)
+                self._browsers[browser_key] = browser
+                return browser
+
+            # Launch browser with conditional args
+            browser = await self._playwright.chromium.launch(
+                headless=HEADLESS,
+                args=list(_BASE_LAUNCH_ARGS + (_CANVAS_DISABLE_ARGS if disable_canvas_webgl else ()))
+            )
+            self._browsers[browser_key] = browser
+            return browser
+
+    async def _new_page(self, disable_canvas_webgl: bool, block_resources: bool) -> _PooledPage:
+        """Open a new context and page on the shared browser"""
+        browser = await self._get_browser(disable_canvas_webgl)
+
+        # Create context with more realistic browser settings and disabled storage
+        context = await browser.new_context(**_CONTEXT_OPTIONS)
+
+        # Add common browser fingerprints and storage cleanup
+        await context.add_init_script(_CONTEXT_INIT_SCRIPT)
+
+        if block_resources:
+            await context.route("**/*", _block_unneeded_resources)
+
+        # Create page from context and set timeout
+        page = await context.new_page()
+        page.set_default_timeout(120000)  # 1:30 minute timeout
+        pooled = _PooledPage(context=context, page=page)
+        page.on('framenavigated', lambda frame: pooled.record_origin(frame.url))
+        return pooled
+
+    async def _acquire_page(self, domain: str, disable_canvas_webgl: bool, block_resources: bool) -> _PooledPage:
+        """Take an idle page for this domain from the pool, or open a new one"""
+        await self._evict_idle_pages()
+        key = (domain, disable_canvas_webgl, block_resources)
+        idle = self._page_pool.get(key, [])
+        while idle:
+            pooled = idle.pop()
+            if not pooled.page.is_closed() and pooled.context.browser.is_connected():
+                # Same start state as a fresh context: storage was cleared on release, cookies here
+                await pooled.context.clear_cookies()
+                return pooled
+            await self._discard_page(pooled)
+        pooled = await self._new_page(disable_canvas_webgl, block_resources)
+        pooled.key = key
+        return pooled
+
+    async def _release_page(self, pooled: _PooledPage, healthy: bool):
+        """Return a page to the pool, or close it when it is worn out or unhealthy"""
+        pooled.uses += 1
+        reusable = (
+            healthy
+            and pooled.uses < self.PAGE_POOL_MAX_USES
+            and not pooled.page.is_closed()
+            and len(pooled.context.pages) == 1  # geen popups/extra tabs achtergelaten
+        )
+        if reusable:
+            try:
+                # localStorage/sessionStorage/IndexedDB e.d. van deze berekening mogen niet in de volgende terechtkomen
+                await self._clear_page_storage(pooled)
+                # Stop the page's scripts while it sits idle
+                await pooled.page.goto('about:blank')
+            except Exception:
+                reusable = False
+        # Pas na de await opzoeken: _evict_idle_pages kan de lijst intussen hebben verwijderd
+        idle = self._page_pool.setdefault(pooled.key, []) if reusable else None
+        if not reusable or len(idle) >= self.PAGE_POOL_MAX_IDLE:
+            await self._discard_page(pooled)
+            return
+        pooled.idle_since = time.monotonic()
+        idle.append(pooled)
+
+    async def _clear_page_storage(self, pooled: _PooledPage):
+        """Clear all storage of every origin the pooled page visited"""
+        cdp = await pooled.context.new_cdp_session(pooled.page)
         try:
-            # Load domain configs
-            domain_configs = crud.get_domain_configs(db)
-            for config in domain_configs:
-                self.configs[config.domain] = config.config
+            for origin in pooled.origins:
+                await cdp.send('Storage.clearDataForOrigin', {'origin': origin, 'storageTypes': 'all'})
         finally:
-            db.close()
+            await cdp.detach()
+        pooled.origins.clear()
+
+    async def _evict_idle_pages(self):
+        """Close pooled pages idle longer than PAGE_POOL_IDLE_TIMEOUT and drop empty domains"""
+        cutoff = time.monotonic() - self.PAGE_POOL_IDLE_TIMEOUT
+        expired = []
+        # Eerst de pool bijwerken zonder await, zodat een gelijktijdige _release_page niets mist
+        for key, idle in list(self._page_pool.items()):
+            expired.extend(pooled for pooled in idle if pooled.idle_since < cutoff)
+            idle[:] = [pooled for pooled in idle if pooled.idle_since >= cutoff]
+            # Domeinen zonder idle pagina's uit de pool halen, anders groeit die met elk ooit bezocht domein
+            if not idle:
+                del self._page_pool[key]
+        for pooled in expired:
+            await self._discard_page(pooled)
+
+    async def _discard_page(self, pooled: _PooledPage):
+        """Close a pooled page's context, ignoring errors from an already dead browser"""
+        try:
+            await pooled.context.close()
+        except Exception as e:
+            logging.debug(f"Error closing pooled page: {str(e)}")
+
+    async def close(self):
+        """Close the pooled pages, shared browsers and captcha session, and stop Playwright"""
+        if self._captcha_session is not None:
+            await self._captcha_session.close()
+            self._captcha_session = None
+        pooled_pages = [pooled for idle in self._page_pool.values() for pooled in idle]
+        self._page_pool = {}
+        for pooled in pooled_pages:
+            await self._discard_page(pooled)
+        async with self._browser_lock:
+            for browser in self._browsers.values():
+                await browser.close()
+            self._browsers = {}
+            if self._playwright is not None:
+                await self._playwright.stop()
+                self._playwright = None
 
     def _update_status(self, message: str, step_type: str = None, step_details: dict = None):
         """Update the status of the current operation with detailed logging"""
-        # Create the status object
-        PriceCalculator.latest_status = {
-            "message": message,
-            "step_type": step_type,
-            "step_details": step_details,
-            "timestamp": datetime.now().isoformat()
-        }
+        # Only build the status object when an SSE client is listening
+        if PriceCalculator.status_subscribers:
+            status = {
+                "message": message,
+                "step_type": step_type,
+                "step_details": step_details,
+                "timestamp": datetime.now(timezone.utc)  # orjson serialiseert dit als ISO 8601 met +00:00
+            }
+            for queue in PriceCalculator.status_subscribers:
+                try:
+                    queue.put_nowait(status)
+                except asyncio.QueueFull:
+                    queue.get_nowait()
+                    queue.put_nowait(status)
+
+        # Pick the log level first, so nothing is formatted for a level that is filtered out
+        lowered = message.lower()
+        if "error" in lowered:
+            level = logging.ERROR
+        elif "warn" in lowered or "could not" in lowered:
+            level = logging.WARNING
+        else:
+            level = logging.INFO
+        if not logging.getLogger().isEnabledFor(level):
+            return
 
         # Create a detailed log message
         log_parts = []
@@ -68,41 +419,20 @@ class PriceCalculator:
         # Add details if available
         if step_details:
             # Special handling for sensitive data
-            safe_details = step_details.copy()
-            if 'value' in safe_details and step_type == 'input' and safe_details.get('selector', '').lower().find('password') != -1:
-                safe_details['value'] = '[HIDDEN]'
+            safe_details = step_details
+            if step_type == 'input' and 'value' in step_details and 'password' in step_details.get('selector', '').lower():
+                safe_details = {**step_details, 'value': '[HIDDEN]'}
 
             # Format details nicely
-            detail_parts = []
-            for key, value in safe_details.items():
-                if key == 'selector':
-                    detail_parts.append(f"selector='{value}'")
-                elif key == 'status':
-                    detail_parts.append(f"status='{value}'")
-                elif key == 'value':
-                    detail_parts.append(f"value='{value}'")
-                elif key == 'unit':
-                    detail_parts.append(f"unit='{value}'")
-                elif key == 'price':
-                    detail_parts.append(f"price={value:.2f}")
-                elif key == 'calculation':
-                    detail_parts.append(f"calculation='{value}'")
-                else:
-                    detail_parts.append(f"{key}='{value}'")
-
+            detail_parts = [
+                f"price={value:.2f}" if key == 'price' else f"{key}='{value}'"
+                for key, value in safe_details.items()
+            ]
             if detail_parts:
                 log_parts.append("(" + ", ".join(detail_parts) + ")")
 
         # Combine all parts into final log message
-        log_message = " ".join(log_parts)
-
-        # Log with appropriate level
-        if "error" in message.lower():
-            logging.error(log_message)
-        elif "warn" in message.lower() or "could not" in message.lower():
-            logging.warning(log_message)
-        else:
-            logging.info(log_message)
+        logging.log(level, " ".join(log_parts))
 
     async def calculate_price(self, url: str, dimensions: Dict[str, float], country: str = 'nl', category: str = 'square_meter_price') -> Tuple[float, float]:
         """Calculate price based on dimensions for a given URL"""
@@ -110,22 +440,16 @@ class PriceCalculator:
             # Get domain from URL
             domain = self._normalize_domain(url)
 
-            # Get configuration for domain
-            config = self.configs.get(domain)
+            # Domain and country configuration come from the config cache (invalidated on
+            # every write); a cache miss hits the database in a worker thread so the event
+            # loop keeps driving the other calculations' browsers meanwhile
+            config, country_info = await asyncio.to_thread(_load_calculation_configs, domain, country)
             if not config:
                 self._update_status(f"No configuration found for domain: {domain}", "error")
                 raise ValueError(f"No configuration found for domain: {domain}")
-
-            # Get country configuration from database
-            db = SessionLocal()
-            try:
-                country_config = crud.get_country_config(db, country)
-                if not country_config:
-                    self._update_status(f"No configuration found for country: {country}", "error")
-                    raise ValueError(f"No configuration found for country: {country}")
-                country_info = country_config.config
-            finally:
-                db.close()
+            if country_info is None:
+                self._update_status(f"No configuration found for country: {country}", "error")
+                raise ValueError(f"No configuration found for country: {country}")
 
             # Update status with configuration info
             self._update_status(f"Using configuration for {domain}", "config", {"domain": domain})
@@ -160,205 +484,139 @@ class PriceCalculator:
             }
             self._update_status(f"Starting price calculation for {domain}", "config", debug_info)
 
-            async with async_playwright() as p:
-                # Get browser config from domain config
-                disable_canvas_webgl = config.get('disable_canvas_webgl', False)  # Default to False for anti-detection
-
-                # Build args conditionally
-                args = [
-                    '--disable-blink-features=AutomationControlled',
-                    '--disable-features=IsolateOrigins,site-per-process',
-                    '--disable-application-cache',
-                    '--disable-cache',
-                    '--disable-offline-load-stale-cache',
-                    '--disk-cache-size=0',
-                    f'--user-agent=Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                ]
-                if disable_canvas_webgl:
-                    args.extend([
-                        '--disable-accelerated-2d-canvas',
-                        '--disable-webgl',
-                        '--disable-gpu',
-                        '--disable-software-rasterizer',
-                    ])
-
-                # Launch browser with conditional args
-                browser = await p.chromium.launch(
-                    headless=HEADLESS,
-                    args=args
-                )
-
-                # Create context with more realistic browser settings and disabled storage
-                context = await browser.new_context(
-                    viewport={'width': 1920, 'height': 1080},
-                    user_agent='Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/122.0.0.0 Safari/537.36',
-                    locale='nl-NL',
-                    timezone_id='Europe/Amsterdam',
-                    geolocation={'latitude': 52.3676, 'longitude': 4.9041},  # Amsterdam coordinates
-                    permissions=['geolocation'],
-                    color_scheme='light',
-                    has_touch=True,
-                    is_mobile=False,
-                    device_scale_factor=2,
-                    java_script_enabled=True,
-                    storage_state={'cookies': [], 'origins': []},  # Start with empty storage
-                    ignore_https_errors=True,
-                    bypass_csp=True,
-                )
-
-                # Add common browser fingerprints and storage cleanup
-                await context.add_init_script("""
-                    Object.defineProperty(navigator, 'webdriver', {
-                        get: () => undefined
-                    });
-                    Object.defineProperty(navigator, 'languages', {
-                        get: () => ['nl-NL', 'nl', 'en-US', 'en']
-                    });
-                    Object.defineProperty(screen, 'colorDepth', {
-                        get: () => 24
-                    });
-
-                    // Clear all storage on page load
-                    window.addEventListener('load', () => {
-                        localStorage.clear();
-                        sessionStorage.clear();
-                        indexedDB.deleteDatabase('_all_');
-                    });
-                """)
-
-                # Create page from context and set timeout
-                page = await context.new_page()
-                page.set_default_timeout(120000)  # 1:30 minute timeout
+            # Get browser config from domain config
+            disable_canvas_webgl = config.get('disable_canvas_webgl', False)  # Default to False for anti-detection
+            block_resources = config.get('block_resources', True)  # Images, media, fonts en trackers niet laden
 
-                try:
-                    # Navigate to URL with increased timeout
-                    self._update_status(f"Navigating to {url}", "navigation", {"url": url})
-                    await page.goto(url)
+            # Pooled page (own context) for this domain; reused by later calculations on the same domain
+            pooled = await self._acquire_page(domain, disable_canvas_webgl, block_resources)
+            page = pooled.page
+            failed = False
 
-                    # Execute steps
-                    steps = config['categories'][category]['steps']
+            try:
+                # Navigate to URL with increased timeout
+                self._update_status(f"Navigating to {url}", "navigation", {"url": url})
+                # Only wait for the DOM; the steps wait for their own selectors
+                await page.goto(url, wait_until='domcontentloaded')
 
-                    # Wait for page to be ready using multiple strategies
-                    self._update_status("Waiting for page to load completely", "loading")
+                # Execute steps
+                steps = config['categories'][category]['steps']
 
+                # Domains that really need a quiet network can opt in per config
+                if config.get('wait_strategy') == 'networkidle':
+                    self._update_status("Waiting for network idle", "loading")
                     try:
-                        # Strategy 1: Wait for network idle (most reliable for dynamic content)
                         await page.wait_for_load_state('networkidle', timeout=15000)
                         self._update_status("Page loaded successfully (networkidle)", "loaded")
-                    except:
-                        try:
-                            # Strategy 2: Wait for DOM content to be loaded
-                            await page.wait_for_load_state('domcontentloaded', timeout=10000)
-                            # Give a bit more time for any remaining dynamic content
-                            await asyncio.sleep(2)
-                            self._update_status("Page loaded successfully (domcontentloaded)", "loaded")
-                        except:
-                            # Strategy 3: Fallback - just wait a reasonable amount of time
-                            await asyncio.sleep(3)
-                            self._update_status("Page load timeout, proceeding anyway", "loaded")
-
-                    current_category = category  # Track current category for config switching
-                    step_index = 0
-
-                    while step_index < len(steps):
-                        step = steps[step_index]
-                        try:
-                            # Add random mouse movements before each action
-                            if step['type'] in ['click', 'input', 'select']:
-                                await page.mouse.move(
-                                    random.randint(0, 1920),
-                                    random.randint(0, 1080),
-                                    steps=random.randint(5, 10)
-                                )
-
-                            result = await self._process_step(page, step, dimensions)
-
-                            # Handle decide_config step result
-                            if step['type'] == 'decide_config' and result is not None:
-                                if result.get('switch_config', False):
-                                    new_config = result.get('new_config')
-                                    if new_config and new_config in config['categories']:
-                                        self._update_status(
-                                            f"Switching from '{current_category}' to '{new_config}' configuration",
-                                            "config_switch",
-                                            {
-                                                "from_config": current_category,
-                                                "to_config": new_config,
-                                                "reason": "decide_config_triggered"
-                                            }
-                                        )
-                                        # Switch to new configuration
-                                        current_category = new_config
-                                        steps = config['categories'][current_category]['steps']
-                                        # Continue from the next step in the new configuration
-                                        step_index = 0
-                                        continue
-                                    else:
-                                        self._update_status(
-                                            f"Fallback configuration '{new_config}' not found, continuing with current",
-                                            "warn"
-                                        )
-                                # If not switching, just continue with next step
-                                step_index += 1
-                                continue
-
-                            if step['type'] == 'read_price' and result is not None:
-                                # Convert price based on VAT
-                                vat_rate = country_info['vat_rate']
-                                if step.get('includes_vat', False):
-                                    price_excl = result / (1 + vat_rate/100)
-                                    price_incl = result
-                                else:
-                                    price_excl = result
-                                    price_incl = result * (1 + vat_rate/100)
+                    except Exception:
+                        self._update_status("Network idle timeout, proceeding anyway", "loaded")
+                else:
+                    self._update_status("Page loaded successfully (domcontentloaded)", "loaded")
 
-                                self._update_status(
-                                    "Price calculation completed",
-                                    "complete",
-                                    {
-                                        "price_excl_vat": price_excl,
-                                        "price_incl_vat": price_incl,
-                                        "currency_symbol": country_info.get('currency_symbol', '€'),
-                                        "currency_format": country_info.get('currency_format', '{amount}'),
-                                        "decimal_separator": country_info.get('decimal_separator', ','),
-                                        "thousands_separator": country_info.get('thousands_separator', '.'),
-                                        "formatted_excl": self._format_price(price_excl, country_info.get('currency_format', '{amount}'), country_info.get('decimal_separator', ','), country_info.get('thousands_separator', '.')),
-                                        "formatted_incl": self._format_price(price_incl, country_info.get('currency_format', '{amount}'), country_info.get('decimal_separator', ','), country_info.get('thousands_separator', '.')),
-                                        "currency": country_info.get('currency', 'EUR')
-                                    }
-                                )
+                current_category = category  # Track current category for config switching
+                step_index = 0
 
-                                return price_excl, price_incl
-                        except Exception as step_error:
-                            if step.get('continue_on_error', False):
-                                self._update_status(
-                                    f"Step failed but continuing: {str(step_error)}",
-                                    'warn',
-                                    {**step, 'error': str(step_error), 'continuing': True}
-                                )
-                                if step['type'] == 'read_price':
-                                    # If it's a read_price step that failed, return 0.00 prices
+                while step_index < len(steps):
+                    step = steps[step_index]
+                    try:
+                        # Add random mouse movements before each action
+                        if step['type'] in self._STEPS_WITH_MOUSE_MOVE:
+                            await page.mouse.move(
+                                random.randint(0, 1920),
+                                random.randint(0, 1080),
+                                steps=random.randint(5, 10)
+                            )
+
+                        result = await self._process_step(page, step, dimensions)
+
+                        # Handle decide_config step result
+                        if step['type'] == 'decide_config' and result is not None:
+                            if result.get('switch_config', False):
+                                new_config = result.get('new_config')
+                                if new_config and new_config in config['categories']:
                                     self._update_status(
-                                        "Returning 0.00 for failed price reading step",
-                                        "complete",
+                                        f"Switching from '{current_category}' to '{new_config}' configuration",
+                                        "config_switch",
                                         {
-                                            "price_excl_vat": 0.00,
-                                            "price_incl_vat": 0.00
+                                            "from_config": current_category,
+                                            "to_config": new_config,
+                                            "reason": "decide_config_triggered"
                                         }
                                     )
-                                    return 0.00, 0.00
-                                step_index += 1
-                                continue
+                                    # Switch to new configuration
+                                    current_category = new_config
+                                    steps = config['categories'][current_category]['steps']
+                                    # Continue from the next step in the new configuration
+                                    step_index = 0
+                                    continue
+                                else:
+                                    self._update_status(
+                                        f"Fallback configuration '{new_config}' not found, continuing with current",
+                                        "warn"
+                                    )
+                            # If not switching, just continue with next step
+                            step_index += 1
+                            continue
+
+                        if step['type'] == 'read_price' and result is not None:
+                            # Convert price based on VAT
+                            vat_rate = country_info['vat_rate']
+                            if step.get('includes_vat', False):
+                                price_excl = result / (1 + vat_rate/100)
+                                price_incl = result
                             else:
-                                raise step_error
+                                price_excl = result
+                                price_incl = result * (1 + vat_rate/100)
+
+                            self._update_status(
+                                "Price calculation completed",
+                                "complete",
+                                {
+                                    "price_excl_vat": price_excl,
+                                    "price_incl_vat": price_incl,
+                                    "currency_symbol": country_info.get('currency_symbol', '€'),
+                                    "currency_format": country_info.get('currency_format', '{amount}'),
+                                    "decimal_separator": country_info.get('decimal_separator', ','),
+                                    "thousands_separator": country_info.get('thousands_separator', '.'),
+                                    "formatted_excl": self._format_price(price_excl, country_info.get('currency_format', '{amount}'), country_info.get('decimal_separator', ','), country_info.get('thousands_separator', '.')),
+                                    "formatted_incl": self._format_price(price_incl, country_info.get('currency_format', '{amount}'), country_info.get('decimal_separator', ','), country_info.get('thousands_separator', '.')),
+                                    "currency": country_info.get('currency', 'EUR')
+                                }
+                            )
+
+                            return price_excl, price_incl
+                    except Exception as step_error:
+                        if step.get('continue_on_error', False):
+                            self._update_status(
+                                f"Step failed but continuing: {str(step_error)}",
+                                'warn',
+                                {**step, 'error': str(step_error), 'continuing': True}
+                            )
+                            if step['type'] == 'read_price':
+                                # If it's a read_price step that failed, return 0.00 prices
+                                self._update_status(
+                                    "Returning 0.00 for failed price reading step",
+                                    "complete",
+                                    {
+                                        "price_excl_vat": 0.00,
+                                        "price_incl_vat": 0.00
+                                    }
+                                )
+                                return 0.00, 0.00
+                            step_index += 1
+                            continue
+                        else:
+                            raise step_error
 
-                        step_index += 1
+                    step_index += 1
 
-                except Exception as e:
-                    self._update_status(f"Error: {str(e)}", "error")
-                    raise
-                finally:
-                    await browser.close()
+            except Exception as e:
+                failed = True
+                self._update_status(f"Error: {str(e)}", "error")
+                raise
+            finally:
+                # A page from a failed calculation is closed, a healthy one goes back to the pool
+                await self._release_page(pooled, healthy=not failed)
 
         except Exception as e:
             self._update_status(f"Error calculating price: {str(e)}", "error")
@@ -405,6 +663,36 @@ class PriceCalculator:
                 self._update_status(f"Could not highlight element: {str(e)}", "warn")
                 continue
 
+    def _fill_dimension_placeholders(self, text: str, dimensions: dict, unit: str):
+        """
+        Replace {thickness}/{width}/{length}/{quantity} in text in a single regex pass.
+
+        Returns:
+            (text, replaced, missing): replaced maps each substituted key to its value,
+            missing lists placeholders without a dimension (left in the text)
+        """
+        replaced = {}
+        missing = []
+        if '{' not in text:
+            return text, replaced, missing
+
+        def _replace(match):
+            key = match.group(1)
+            if key in replaced:
+                return str(replaced[key])
+            if key not in dimensions:
+                if key not in missing:
+                    missing.append(key)
+                return match.group(0)
+            converted_value = self._convert_value(dimensions[key], unit)
+            # Convert to integer if it's a whole number
+            if isinstance(converted_value, float) and converted_value.is_integer():
+                converted_value = int(converted_value)
+            replaced[key] = converted_value
+            return str(converted_value)
+
+        return _DIMENSION_PLACEHOLDER_RE.sub(_replace, text), replaced, missing
+
     def _substitute_dynamic_selector(self, selector: str, dimensions: dict, step: dict, operation_type: str = "operation") -> str:
         """
         Handle dynamic selector substitution with dimension variables.
@@ -422,30 +710,54 @@ class PriceCalculator:
             return selector
 
         original_selector = selector
-        for key in ['thickness', 'width', 'length', 'quantity']:
-            if f"{{{key}}}" in selector:
-                if key in dimensions:
-                    # Convert value and substitute
-                    value = dimensions[key]
-                    unit = step.get('unit', 'mm')
-                    converted_value = self._convert_value(value, unit)
-
-                    # Convert to integer if it's a whole number
-                    if isinstance(converted_value, float) and converted_value.is_integer():
-                        converted_value = int(converted_value)
-
-                    selector = selector.replace(f"{{{key}}}", str(converted_value))
-                    self._update_status(
-                        f"Dynamic selector: replaced {{{key}}} with {converted_value}",
-                        operation_type,
-                        {"original_selector": original_selector, "final_selector": selector}
-                    )
-                else:
-                    self._update_status(f"Dimension {key} not found for dynamic selector", "error")
-                    raise ValueError(f"Dimension {key} not found in dimensions dict")
+        selector, replaced, missing = self._fill_dimension_placeholders(selector, dimensions, step.get('unit', 'mm'))
+        if missing:
+            key = missing[0]
+            self._update_status(f"Dimension {key} not found for dynamic selector", "error")
+            raise ValueError(f"Dimension {key} not found in dimensions dict")
+
+        for key, converted_value in replaced.items():
+            self._update_status(
+                f"Dynamic selector: replaced {{{key}}} with {converted_value}",
+                operation_type,
+                {"original_selector": original_selector, "final_selector": selector}
+            )
 
         return selector
 
+    async def _await_dropdown_options(self, page, timeout: int = 2000):
+        """Wait until an opened custom dropdown shows its options (instead of a fixed delay)"""
+        try:
+            await page.wait_for_selector(_DROPDOWN_OPTION_SELECTOR, state='visible', timeout=timeout)
+        except Exception:
+            pass  # Geen zichtbare opties; de aanroeper handelt een lege lijst af
+
+    async def _await_dom_settled(self, page, quiet_ms: int = 100, timeout_ms: int = 2000):
+        """Wait until the DOM has had no mutations for quiet_ms (at most timeout_ms)"""
+        try:
+            await page.evaluate(_DOM_SETTLED_JS, [quiet_ms, timeout_ms])
+        except Exception as e:
+            logging.debug(f"DOM settle wait failed: {str(e)}")
+
+    async def _await_first_load_state(self, page, states, timeout: int):
+        """Wait for several load states at once; return the first one reached, or None on timeout"""
+        waits = {asyncio.create_task(page.wait_for_load_state(state, timeout=timeout)): state for state in states}
+        pending = set(waits)
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, timeout=timeout / 1000, return_when=asyncio.FIRST_COMPLETED)
+                if not done:
+                    return None
+                for task in done:
+                    if task.exception() is None:
+                        return waits[task]
+            return None
+        finally:
+            for task in pending:
+                task.cancel()
+            # Geannuleerde waits afhandelen zodat er geen "exception never retrieved" warnings komen
+            await asyncio.gather(*pending, return_exceptions=True)
+
     async def _handle_select(self, page, step, dimensions):
         """Handle a select/input step"""
         # Controleer eerst of 'value' aanwezig is in de step dictionary
@@ -493,16 +805,16 @@ class PriceCalculator:
                 tag_name = await element.evaluate('el => el.tagName.toLowerCase()')
                 if tag_name == 'select':
                     await element.select_option(index=index)
-                    await asyncio.sleep(0.5)
+                    await self._await_dom_settled(page)
                     return
                 else:
                     # For non-standard dropdowns
                     await element.click()
-                    await asyncio.sleep(0.5)
-                    options = await page.query_selector_all('li, .option, .dropdown-item, [role="option"]')
-                    if index < len(options):
-                        await options[index].click()
-                        await asyncio.sleep(0.5)
+                    await self._await_dropdown_options(page)
+                    options = page.locator(_DROPDOWN_OPTION_SELECTOR)
+                    if index < await options.count():
+                        await options.nth(index).click()
+                        await self._await_dom_settled(page)
                         return
                     else:
                         raise ValueError(f"Index {index} out of range for options list")
@@ -524,44 +836,40 @@ class PriceCalculator:
                     # Voor select elementen, selecteer de eerste optie
                     await element.select_option(index=0)
                     self._update_status(f"Selected first option for empty value", "select")
-                    await asyncio.sleep(0.5)
+                    await self._await_dom_settled(page)
                     return
                 else:
                     # Voor non-standard dropdowns, klik erop en selecteer de eerste optie
                     await element.click()
-                    await asyncio.sleep(0.5)
-                    options = await page.query_selector_all('li, .option, .dropdown-item, [role="option"]')
-                    if options and len(options) > 0:
-                        await options[0].click()
+                    await self._await_dropdown_options(page)
+                    options = page.locator(_DROPDOWN_OPTION_SELECTOR)
+                    if await options.count() > 0:
+                        await options.first.click()
                         self._update_status(f"Selected first dropdown option for empty value", "select")
-                        await asyncio.sleep(0.5)
+                        await self._await_dom_settled(page)
                         return
             except Exception as e:
                 self._update_status(f"Error selecting first option: {str(e)}", "warn")
                 # Ga verder met reguliere selectie
 
         # Handle regular value-based selection
-        for key in ['thickness', 'width', 'length', 'quantity']:
-            if f"{{{key}}}" in value:
-                if key in dimensions:
-                    converted_value = self._convert_value(dimensions[key], step.get('unit', 'mm'))
-                    # Convert to integer if it's a whole number
-                    if isinstance(converted_value, float) and converted_value.is_integer():
-                        converted_value = int(converted_value)
-                    value = value.replace(f"{{{key}}}", str(converted_value))
-                    unit_display = step.get('unit', 'mm')
-                    self._update_status(
-                        f"Setting {key} to {converted_value} {unit_display}",
-                        "select",
-                        {
-                            "selector": selector,
-                            "value": str(converted_value),
-                            "unit": unit_display
-                        }
-                    )
-                else:
-                    self._update_status(f"Dimension {key} not found", "error")
-                    raise ValueError(f"Dimension {key} not found in dimensions dict")
+        unit_display = step.get('unit', 'mm')
+        value, replaced, missing = self._fill_dimension_placeholders(value, dimensions, unit_display)
+        if missing:
+            key = missing[0]
+            self._update_status(f"Dimension {key} not found", "error")
+            raise ValueError(f"Dimension {key} not found in dimensions dict")
+
+        for key, converted_value in replaced.items():
+            self._update_status(
+                f"Setting {key} to {converted_value} {unit_display}",
+                "select",
+                {
+                    "selector": selector,
+                    "value": str(converted_value),
+                    "unit": unit_display
+                }
+            )
 
         logging.info(f"Handling select/input: {selector} with target value {value}")
         self._update_status(f"Handling select/input with value {value}", "select", {"selector": selector, "value": value})
@@ -580,21 +888,19 @@ class PriceCalculator:
             if tag_name == 'select':
                 # For select elements, try to find option with matching text
                 await element.select_option(label=value)
-                await asyncio.sleep(0.5)
+                await self._await_dom_settled(page)
                 return
             else:
                 # For non-standard dropdowns, try to find an option containing the text
                 await element.click()  # Click to open dropdown
-                await asyncio.sleep(0.5)
-
-                # Try to find options with matching text
-                options = await page.query_selector_all('li, .option, .dropdown-item, [role="option"]')
-                for option in options:
-                    option_text = await option.text_content()
-                    if value.lower() in option_text.lower():
-                        await option.click()
-                        await asyncio.sleep(0.5)
-                        return
+                await self._await_dropdown_options(page)
+
+                # Try to find options with matching text (has_text is case-insensitive, like before)
+                match = page.locator(_DROPDOWN_OPTION_SELECTOR).filter(has_text=value).first
+                if await match.count() > 0:
+                    await match.click()
+                    await self._await_dom_settled(page)
+                    return
 
                 raise ValueError(f"No option found with text containing '{value}'")
 
@@ -603,47 +909,36 @@ class PriceCalculator:
             trigger = await page.wait_for_selector(step['container_trigger'])
             if trigger:
                 await trigger.click()
-                await asyncio.sleep(0.5)
+                await self._await_dom_settled(page)
 
-        # Find all matching elements
-        elements = await page.query_selector_all(selector)
-        if not elements:
+        # Describe all matching elements in one round trip; handles are only fetched for the match
+        candidates = await page.eval_on_selector_all(selector, _DESCRIBE_CANDIDATES_JS)
+        if not candidates:
             raise ValueError(f"No elements found matching selector: {selector}")
 
         best_match = None
         smallest_diff = float('inf')
+        target_digits = len(str(int(target_value)))
 
-        # Try each element
-        for element in elements:
+        # Try each element; the first exact match wins
+        for index, candidate in enumerate(candidates):
             try:
-                # Get element type
-                tag_name = await element.evaluate('el => el.tagName.toLowerCase()')
-                element_type = await element.get_attribute('type') if tag_name == 'input' else None
-
-                # Get the value and any associated text
-                value_attr = await element.get_attribute('value')
-                element_text = ''
+                tag_name = candidate['tag']
+                element_type = candidate['type']
+                value_attr = candidate['value']
 
                 if tag_name == 'select':
-                    # For select elements, get all options
-                    options = await element.evaluate('''(select) => {
-                        return Array.from(select.options).map(option => ({
-                            value: option.value,
-                            text: option.text.trim()
-                        }));
-                    }''')
-
-                    for option in options:
+                    for option in candidate['options']:
                         try:
                             # Zoek naar een getal met optionele eenheid (bijv. "2mm" of "2 mm")
-                            numeric_match = re.search(r'(\d+(?:\.\d+)?)\s*(?:mm|cm)?', option['text'])
+                            numeric_match = _DECIMAL_RE.search(option['text'])
                             if numeric_match:
                                 option_value = float(numeric_match.group(1))
                                 # Voeg een extra check toe om te voorkomen dat 2 matcht met 20
-                                if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == len(str(int(target_value))):
+                                if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == target_digits:
                                     smallest_diff = 0
                                     best_match = {
-                                        'element': element,
+                                        'index': index,
                                         'type': 'select',
                                         'value': option['value'],
                                         'option_value': option_value
@@ -651,18 +946,20 @@ class PriceCalculator:
                                     break  # Stop zoeken als we een exacte match hebben gevonden
                         except Exception as e:
                             logging.error(f"Error processing select option: {str(e)}")
+                    if best_match:
+                        break
 
                 elif element_type in ['radio', 'checkbox']:
                     try:
                         # Get numeric value from the value attribute
-                        numeric_match = re.search(r'(\d+(?:\.\d+)?)', value_attr)
+                        numeric_match = _DECIMAL_RE.search(value_attr)
                         if numeric_match:
                             option_value = float(numeric_match.group(1))
                             # Voeg dezelfde extra check toe voor radio/checkbox elementen
-                            if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == len(str(int(target_value))):
+                            if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == target_digits:
                                 smallest_diff = 0
                                 best_match = {
-                                    'element': element,
+                                    'index': index,
                                     'type': 'input',
                                     'option_value': option_value
                                 }
@@ -672,15 +969,15 @@ class PriceCalculator:
 
                 else:
                     # For other elements, try to find numeric value in text content
-                    element_text = await element.text_content()
-                    numeric_match = re.search(r'(\d+(?:\.\d+)?)', element_text)
+                    element_text = candidate['text']
+                    numeric_match = _DECIMAL_RE.search(element_text)
                     if numeric_match:
                         option_value = float(numeric_match.group(1))
                         # Voeg dezelfde extra check toe voor andere elementen
-                        if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == len(str(int(target_value))):
+                        if abs(option_value - target_value) < 0.01 and len(str(int(option_value))) == target_digits:
                             smallest_diff = 0
                             best_match = {
-                                'element': element,
+                                'index': index,
                                 'type': 'other',
                                 'option_value': option_value
                             }
@@ -693,15 +990,14 @@ class PriceCalculator:
         # Select the best matching option
         if best_match and smallest_diff < 0.01:  # Strict matching threshold
             logging.info(f"Found best match with value {best_match.get('option_value')} (diff: {smallest_diff})")
+            best_match['element'] = await page.locator(selector).nth(best_match['index']).element_handle()
 
             # Ensure element is in view and clickable
             await best_match['element'].scroll_into_view_if_needed()
-            await asyncio.sleep(0.5)  # Wait for scroll to complete
 
             if best_match['type'] == 'select':
                 # For select elements, first click to open dropdown
                 await best_match['element'].click()
-                await asyncio.sleep(0.2)
                 # Then select the option
                 await best_match['element'].select_option(value=best_match['value'])
                 # Finally click again to close dropdown
@@ -720,7 +1016,7 @@ class PriceCalculator:
 
             # Dispatch change event
             await best_match['element'].evaluate('(el) => el.dispatchEvent(new Event("change", { bubbles: true }))')
-            await asyncio.sleep(1)
+            await self._await_dom_settled(page)
             return
         else:
             raise ValueError(f"Could not find matching option for value {value}mm (closest diff was {smallest_diff})")
@@ -739,31 +1035,16 @@ class PriceCalculator:
         # Bepaal de uiteindelijke waarde die ingevuld moet worden
         final_value_str = ""
         field_type = None
-
-        selector_re = set(re.split(r'[\W|\_]+', selector.lower()))
+        random_type = None
 
         # Prioriteit 1: Gebruik waarde uit dimensions als het een dimensieveld is
         if dimensions:
             # Check of de selector overeenkomt met een bekend dimensietype
-            if selector_re.intersection(LENGTH_SELECTORS):
-                field_type = 'length'
-                if 'length' in dimensions:
-                    value = dimensions['length']
-            elif selector_re.intersection(WIDTH_SELECTORS):
-                field_type = 'width'
-                if 'width' in dimensions:
-                    value = dimensions['width']
-            elif selector_re.intersection(THICKNESS_SELECTORS):
-                field_type = 'thickness'
-                if 'thickness' in dimensions:
-                    value = dimensions['thickness']
-            elif selector_re.intersection(QUANTITY_SELECTORS):
-                field_type = 'quantity'
-                if 'quantity' in dimensions:
-                    value = dimensions['quantity']
+            field_type = _classify_dimension(selector)
+            value = dimensions.get(field_type, _MISSING)
 
             # Als een dimensieveld is herkend en een waarde gevonden in dimensions:
-            if field_type and 'value' in locals():
+            if field_type and value is not _MISSING:
                 # Converteer naar de juiste eenheid (cm of mm)
                 if unit == 'cm':
                     value = value / 10
@@ -787,59 +1068,29 @@ class PriceCalculator:
             # ... (logica voor het genereren van random waardes blijft hier) ...
             # Genereer willekeurige waarde op basis van het type
             if random_type == 'First Name':
-                # Include both German and Dutch first names
-                first_names = [
-                    # German names
-                    'Hans', 'Klaus', 'Peter', 'Michael', 'Wolfgang', 'Thomas', 'Andreas', 'Stefan', 'Martin', 'Christian',
-                    'Anna', 'Maria', 'Ursula', 'Monika', 'Elisabeth', 'Petra', 'Sabine', 'Andrea', 'Claudia', 'Susanne',
-                    # Dutch names
-                    'Jan', 'Piet', 'Klaas', 'Willem', 'Hendrik', 'Maria', 'Anna', 'Sara', 'Emma', 'Sophie'
-                ]
-                final_value_str = random.choice(first_names)
+                final_value_str = random.choice(random_values.FIRST_NAMES)
                 self._update_status(f"Using random first name: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'Last Name':
-                # Include both German and Dutch last names
-                last_names = [
-                    # German names
-                    'Müller', 'Schmidt', 'Schneider', 'Fischer', 'Weber', 'Meyer', 'Wagner', 'Becker', 'Schulz', 'Hoffmann',
-                    # Dutch names
-                    'Jansen', 'de Vries', 'van den Berg', 'Bakker', 'Visser', 'Meijer', 'de Boer', 'Mulder', 'de Groot', 'Bos'
-                ]
-                final_value_str = random.choice(last_names)
+                final_value_str = random.choice(random_values.LAST_NAMES)
                 self._update_status(f"Using random last name: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'Email Address':
-                domains = ['gmail.com', 'outlook.com', 'hotmail.com', 'yahoo.com', 'protonmail.com', 'gmx.de', 'web.de', 't-online.de']
-                first_names = ['jan', 'piet', 'klaas', 'hans', 'klaus', 'peter', 'maria', 'anna', 'sara', 'emma']
-                last_names = ['mueller', 'schmidt', 'schneider', 'jansen', 'devries', 'bakker', 'visser', 'meijer', 'deboer']
-                numbers = [str(random.randint(1, 999)) for _ in range(3)]
-
                 # Create email with random parts
-                parts = [random.choice(first_names), random.choice(last_names), random.choice(numbers)]
+                parts = [random.choice(random_values.EMAIL_FIRST_NAMES), random.choice(random_values.EMAIL_LAST_NAMES), str(random.randint(1, 999))]
                 random.shuffle(parts)
                 email_name = '.'.join(parts[:2])
-                domain = random.choice(domains)
+                domain = random.choice(random_values.EMAIL_DOMAINS)
                 final_value_str = f"{email_name}@{domain}"
                 self._update_status(f"Using random email: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'Street':
-                # German street names
-                streets = [
-                    'Hauptstraße', 'Schulstraße', 'Bahnhofstraße', 'Gartenstraße', 'Kirchstraße',
-                    'Bergstraße', 'Waldstraße', 'Dorfstraße', 'Lindenstraße', 'Poststraße'
-                ]
-                final_value_str = random.choice(streets)
+                final_value_str = random.choice(random_values.STREETS)
                 self._update_status(f"Using random street: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'City':
-                # German cities
-                cities = [
-                    'Berlin', 'Hamburg', 'München', 'Köln', 'Frankfurt',
-                    'Stuttgart', 'Düsseldorf', 'Leipzig', 'Dortmund', 'Essen'
-                ]
-                final_value_str = random.choice(cities)
+                final_value_str = random.choice(random_values.CITIES)
                 self._update_status(f"Using random city: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'Phone Number':
                 # German mobile phone format
-                prefix = random.choice(['0151', '0152', '0157', '0159', '0160', '0170', '0171', '0172', '0173', '0174'])
-                number = ''.join([str(random.randint(0, 9)) for _ in range(8)])
+                prefix = random.choice(random_values.PHONE_PREFIXES)
+                number = ''.join(random.choices(string.digits, k=8))
                 final_value_str = f"{prefix}{number}"
                 self._update_status(f"Using random phone number: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
             elif random_type == 'Postal Code':
@@ -850,7 +1101,7 @@ class PriceCalculator:
                 # German house number (1-999, optionally with a letter)
                 number = random.randint(1, 999)
                 if random.random() < 0.1:  # 10% chance to add a letter
-                    letter = random.choice(['a', 'b', 'c', 'd'])
+                    letter = random.choice(random_values.HOUSE_NUMBER_LETTERS)
                     final_value_str = f"{number}{letter}"
                 else:
                     final_value_str = str(number)
@@ -871,14 +1122,7 @@ class PriceCalculator:
                 )
 
                 # Bepaal de tekens die gebruikt kunnen worden
-                chars = string.ascii_lowercase
-                if include_uppercase:
-                    chars += string.ascii_uppercase
-                if include_numbers:
-                    chars += string.digits
-                if include_special:
-                    # Use a more limited set of special characters that are more likely to work across websites
-                    chars += '!@#$%^&*'
+                chars = random_values.PASSWORD_CHARS[bool(include_uppercase), bool(include_numbers), bool(include_special)]
 
                 # Genereer een wachtwoord met willekeurige lengte tussen min en max
                 password_length = random.randint(min_length, max_length)
@@ -890,11 +1134,11 @@ class PriceCalculator:
                 if include_numbers:
                     must_include.append(random.choice(string.digits))
                 if include_special:
-                    must_include.append(random.choice('!@#$%^&*'))
+                    must_include.append(random.choice(random_values.PASSWORD_SPECIAL_CHARS))
 
                 # Generate remaining characters
                 remaining_length = password_length - len(must_include)
-                remaining_chars = [random.choice(chars) for _ in range(remaining_length)]
+                remaining_chars = random.choices(chars, k=remaining_length)
 
                 # Combine and shuffle
                 all_chars = must_include + remaining_chars
@@ -918,8 +1162,7 @@ class PriceCalculator:
                     }
                 )
             else:  # Generic Term
-                terms = ['test', 'sample', 'example', 'demo', 'trial', 'preview', 'beta', 'review', 'check', 'verify']
-                final_value_str = random.choice(terms)
+                final_value_str = random.choice(random_values.GENERIC_TERMS)
                 self._update_status(f"Using random term: {final_value_str}", "input", {"selector": selector, "value": final_value_str})
 
 
@@ -933,29 +1176,19 @@ class PriceCalculator:
 
                 # Vervang eventuele variabelen in de value string (als die er toch zijn)
                 if dimensions:
-                    temp_value = final_value_str
-                    for key in ['thickness', 'width', 'length', 'quantity']:
-                        if f"{{{key}}}" in temp_value:
-                            if key in dimensions:
-                                converted_value = self._convert_value(dimensions[key], unit)
-                                if isinstance(converted_value, float) and converted_value.is_integer():
-                                    converted_value = int(converted_value)
-                                temp_value = temp_value.replace(f"{{{key}}}", str(converted_value))
-                                unit_display = unit
-                                self._update_status(
-                                    f"Replacing variable {{{key}}} in step value with {converted_value} {unit_display}",
-                                    "input", {"selector": selector}
-                                )
-                            else:
-                                self._update_status(f"Dimension {key} not found for variable in value", "warn")
+                    temp_value, replaced, missing = self._fill_dimension_placeholders(final_value_str, dimensions, unit)
+                    for key, converted_value in replaced.items():
+                        self._update_status(
+                            f"Replacing variable {{{key}}} in step value with {converted_value} {unit}",
+                            "input", {"selector": selector}
+                        )
+                    for key in missing:
+                        self._update_status(f"Dimension {key} not found for variable in value", "warn")
                     final_value_str = temp_value # Update final value if variables were replaced
 
         # Log de definitieve waarde die we gaan gebruiken
         logging.info(f"Final value to input for {selector}: {final_value_str}")
-        # Correct the random_type check here, initialize random_type if not set
-        random_type_for_log = None
-        if 'random_type' in locals():
-             random_type_for_log = random_type
+        random_type_for_log = random_type
 
         self._update_status(f"Setting input value to {final_value_str if random_type_for_log != 'Password' else '[HIDDEN]'}", "input", {"selector": selector, "value": final_value_str if random_type_for_log != 'Password' else '[HIDDEN]'})
 
@@ -976,23 +1209,19 @@ class PriceCalculator:
                 # Focus op het element voordat we beginnen
                 await element.focus()
 
-                if clear_first:
-                    # Leeg het veld op verschillende manieren
-                    await element.fill('')
-                    # await element.evaluate('(el) => { el.value = ""; }')
-
-                    # # Selecteer alle tekst en verwijder
-                    # await element.click(click_count=3)  # Triple click selecteert alle tekst
-                    # await element.press('Backspace')
-
-                # Type de NIEUWE definitieve waarde
+                # Vul de NIEUWE definitieve waarde in
                 try:
-                    # Handle passwords with special characters
-                    if random_type_for_log == 'Password': # Check against potentially set random_type_for_log
-                        # First try with type()
+                    if random_type_for_log == 'Password':
+                        # Wachtwoorden toets voor toets, sommige velden controleren per keypress
+                        if clear_first:
+                            await element.fill('')
                         await element.type(final_value_str, delay=50)
+                    elif clear_first:
+                        # fill() leegt het veld en zet de waarde in één keer
+                        await element.fill(final_value_str)
                     else:
-                        await element.type(final_value_str, delay=50)
+                        # Achter de bestaande inhoud typen
+                        await element.type(final_value_str)
 
                     # Stuur events om de website te informeren over de wijziging
                     await element.evaluate('''(el) => {
@@ -1247,23 +1476,18 @@ class PriceCalculator:
         """Extract numeric price from text, handling different thousand/decimal separators."""
         try:
             # Log the original price text for debugging
-            logging.info(f"Extracting price from: '{price_text}'")
-
-            # First, try to find a number pattern with optional currency symbols
-            # This regex looks for: optional currency, number with optional separators, optional currency
-            price_pattern = r'[€$£¥]?\s*(\d{1,3}(?:[,.]\d{3})*(?:[,.]\d{1,2})?)\s*[€$£¥]?'
+            logging.debug("Extracting price from: '%s'", price_text)
 
-            match = re.search(price_pattern, price_text)
+            match = _PRICE_NUMBER_RE.search(price_text)
             if not match:
                 # Fallback: look for any number in the text
-                number_pattern = r'(\d+(?:[,.]\d+)?)'
-                match = re.search(number_pattern, price_text)
+                match = _ANY_NUMBER_RE.search(price_text)
                 if not match:
                     logging.warning(f"No numeric value found in price text: '{price_text}'")
                     return 0.0
 
             number_str = match.group(1)
-            logging.info(f"Extracted number string: '{number_str}'")
+            logging.debug("Extracted number string: '%s'", number_str)
 
             # Now handle the decimal/thousands separator logic
             has_dot = '.' in number_str
@@ -1313,16 +1537,15 @@ class PriceCalculator:
                     raise ValueError(f"Kon geen dropdown trigger vinden met selector: {selector}")
 
                 await trigger.click()
-                await page.wait_for_timeout(500)  # Wait for dropdown to open
 
-                # Now find the option in the popper container
+                # Now find the option in the popper container (waits until the dropdown has opened)
                 option_selector = f"li[data-value='{value}']"
                 option = await page.wait_for_selector(option_selector, state="visible")
                 if not option:
                     raise ValueError(f"Kon geen optie vinden voor waarde {value}mm")
 
                 await option.click()
-                await page.wait_for_timeout(500)  # Wait for selection to process
+                await self._await_dom_settled(page)  # Wait for selection to process
 
                 logging.info(f"Custom dropdown: waarde {value}mm geselecteerd")
                 return
@@ -1354,7 +1577,7 @@ class PriceCalculator:
             logging.info(f"Controleren optie: '{option_text}'")
 
             # Extract number from option text (e.g. "3mm" -> 3.0)
-            number_match = re.search(r'(\d+(?:\.\d+)?)', option_text)
+            number_match = _DECIMAL_RE.search(option_text)
             if number_match:
                 option_value = float(number_match.group(1))
                 if abs(option_value - value) < 0.1:  # Allow small difference for float comparison
@@ -1362,7 +1585,7 @@ class PriceCalculator:
                     logging.info(f"Match gevonden! Selecteren van optie: {option_text}")
                     await element.select_option(value=option['value'])
                     await page.evaluate('(el) => { el.dispatchEvent(new Event("change")); }', element)
-                    await page.wait_for_timeout(1000)
+                    await self._await_dom_settled(page)
                     break
 
         if not match_found:
@@ -1391,7 +1614,7 @@ class PriceCalculator:
                     if any(term.lower() in text for term in search_terms):
                         if element_type == 'text':
                             # Voor m² prijzen: zoek naar getallen in dezelfde tekst
-                            price_matches = re.findall(r'€?\s*(\d+(?:[,.]\d+)?)', text)
+                            price_matches = _EURO_AMOUNT_RE.findall(text)
                             if price_matches:
                                 price = float(price_matches[0].replace(',', '.'))
                                 matches.append({
@@ -1471,54 +1694,56 @@ class PriceCalculator:
 
     async def analyze_form_fields(self, url: str) -> Dict:
         """Analyseert de form fields op de pagina"""
+        context = None
         try:
-            async with async_playwright() as p:
-                # Launch browser in non-headless mode
-                browser = await p.chromium.launch(headless=HEADLESS)
-                # Create page with full HD viewport
-                page = await browser.new_page(viewport={'width': 1920, 'height': 1080})
-                await page.goto(url)
-
-                dimension_fields = {}
-
-                # Zoektermen voor verschillende dimensies
-                dimension_terms = {
-                    'dikte': {
-                        'terms': ['dikte', 'thickness', 'dicke', 'épaisseur', 'mm', 'millimeter'],
-                        'type': 'select'
-                    },
-                    'lengte': {
-                        'terms': ['lengte', 'length', 'länge', 'longueur'],
-                        'type': 'input'
-                    },
-                    'breedte': {
-                        'terms': ['breedte', 'width', 'breite', 'largeur', 'hoogte', 'height', 'höhe', 'hauteur'],
-                        'type': 'input'
-                    }
+            # Shared browser, own context with full HD viewport
+            browser = await self._get_browser(False)
+            context = await browser.new_context(viewport={'width': 1920, 'height': 1080})
+            page = await context.new_page()
+            await page.goto(url)
+
+            dimension_fields = {}
+
+            # Zoektermen voor verschillende dimensies
+            dimension_terms = {
+                'dikte': {
+                    'terms': ['dikte', 'thickness', 'dicke', 'épaisseur', 'mm', 'millimeter'],
+                    'type': 'select'
+                },
+                'lengte': {
+                    'terms': ['lengte', 'length', 'länge', 'longueur'],
+                    'type': 'input'
+                },
+                'breedte': {
+                    'terms': ['breedte', 'width', 'breite', 'largeur', 'hoogte', 'height', 'höhe', 'hauteur'],
+                    'type': 'input'
                 }
+            }
 
-                # Zoek naar elk type dimensie
-                for dimension, config in dimension_terms.items():
-                    result = await self._find_nearest_element(
-                        page,
-                        config['terms'],
-                        config['type']
-                    )
+            # Zoek naar elk type dimensie
+            for dimension, config in dimension_terms.items():
+                result = await self._find_nearest_element(
+                    page,
+                    config['terms'],
+                    config['type']
+                )
 
-                    if result:
-                        print(f"Gevonden {dimension} veld: {result['text']}")
-                        dimension_fields[dimension] = [{
-                            'id': result['id'],
-                            'label': result['text'],
-                            'tag': config['type']
-                        }]
+                if result:
+                    print(f"Gevonden {dimension} veld: {result['text']}")
+                    dimension_fields[dimension] = [{
+                        'id': result['id'],
+                        'label': result['text'],
+                        'tag': config['type']
+                    }]
 
-                await browser.close()
-                return dimension_fields
+            return dimension_fields
 
         except Exception as e:
             print(f"Error tijdens form analyse: {str(e)}")
             return {}
+        finally:
+            if context is not None:
+                await context.close()
 
     async def _handle_blur(self, page, step):
         """Handle a blur step by either using the selector from the step or the last interacted element"""
@@ -1663,22 +1888,16 @@ class PriceCalculator:
             await page.reload(wait_until='commit', timeout=timeout)
 
             if wait_for_load:
-                # Use the same robust waiting strategy as the main page loading
-                try:
-                    # Strategy 1: Wait for network idle (most reliable for dynamic content)
-                    await page.wait_for_load_state('networkidle', timeout=15000)
+                # networkidle en domcontentloaded tegelijk; de eerste die klaar is wint
+                state = await self._await_first_load_state(page, ('networkidle', 'domcontentloaded'), timeout=10000)
+                if state == 'networkidle':
                     self._update_status("Page reloaded successfully (networkidle)", "reload", {"status": "success"})
-                except:
-                    try:
-                        # Strategy 2: Wait for DOM content to be loaded
-                        await page.wait_for_load_state('domcontentloaded', timeout=10000)
-                        # Give a bit more time for any remaining dynamic content
-                        await asyncio.sleep(2)
-                        self._update_status("Page reloaded successfully (domcontentloaded)", "reload", {"status": "success"})
-                    except:
-                        # Strategy 3: Fallback - just wait a reasonable amount of time
-                        await asyncio.sleep(3)
-                        self._update_status("Page reload timeout, proceeding anyway", "reload", {"status": "timeout"})
+                elif state == 'domcontentloaded':
+                    # Give any remaining dynamic content a moment to render
+                    await self._await_dom_settled(page)
+                    self._update_status("Page reloaded successfully (domcontentloaded)", "reload", {"status": "success"})
+                else:
+                    self._update_status("Page reload timeout, proceeding anyway", "reload", {"status": "timeout"})
             else:
                 self._update_status("Page reloaded (no wait)", "reload", {"status": "success"})
 
@@ -1694,33 +1913,16 @@ class PriceCalculator:
         step_type = step['type']
 
         try:
-            if step_type == 'select':
-                await self._handle_select(page, step, dimensions)
-            elif step_type == 'input':
-                await self._handle_input(page, step, dimensions)
-            elif step_type == 'click':
-                await self._handle_click(page, step, dimensions)
-            elif step_type == 'wait':
-                await self._handle_wait(page, step)
-            elif step_type == 'blur':
-                await self._handle_blur(page, step)
-            elif step_type == 'modify_element':
-                await self._handle_modify(page, step, dimensions)
-            elif step_type == 'read_price':
-                price = await self._handle_read_price(page, step, dimensions)
-                return price
-            elif step_type == 'navigate':
-                await self._handle_navigate(page, step)
-            elif step_type == 'reload':
-                await self._handle_reload(page, step)
-            elif step_type == 'captcha':
-                await self._handle_captcha(page, step)
-            elif step_type == 'decide_config':
-                result = await self._handle_decide_config(page, step)
-                return result
-            else:
+            handler_name = self._STEP_HANDLERS.get(step_type)
+            if handler_name is None:
                 raise ValueError(f"Unknown step type: {step_type}")
 
+            handler = getattr(self, handler_name)
+            # Alleen read_price en decide_config geven een resultaat terug
+            if step_type in self._STEPS_WITH_DIMENSIONS:
+                return await handler(page, step, dimensions)
+            return await handler(page, step)
+
         except Exception as e:
             if step.get('continue_on_error', False):
                 self._update_status(f"Step failed: {str(e)}, continuing...", "warn")
@@ -1871,16 +2073,8 @@ class PriceCalculator:
     def _format_price(self, amount: float, currency_format: str, decimal_separator: str = ',', thousands_separator: str = '.') -> str:
         """Format a price according to the specified format and separators"""
         try:
-            # Split number into integer and decimal parts
-            str_amount = f"{amount:.2f}"
-            int_part, dec_part = str_amount.split('.')
-
-            # Add thousands separator
-            if len(int_part) > 3:
-                int_part = format(int(int_part), ',').replace(',', thousands_separator)
-
-            # Combine with decimal separator
-            formatted_number = f"{int_part}{decimal_separator}{dec_part}"
+            # Format once with ',' and '.', then swap both separators in a single pass
+            formatted_number = f"{amount:,.2f}".translate(_separator_table(decimal_separator, thousands_separator))
 
             # Replace {amount} in the format string with the formatted number
             return currency_format.replace('{amount}', formatted_number)
@@ -1888,3 +2082,18 @@ class PriceCalculator:
             logging.error(f"Error formatting price: {str(e)}")
             # Fallback to simple formatting
             return f"{amount:.2f}".replace('.', decimal_separator)
+
+@lru_cache(maxsize=None)
+def _separator_table(decimal_separator: str, thousands_separator: str) -> dict:
+    """Translation table from Python's ',' / '.' number format to the country's separators"""
+    return str.maketrans({',': thousands_separator, '.': decimal_separator})
+
+@lru_cache(maxsize=1)
+def get_price_calculator() -> PriceCalculator:
+    """Return the shared calculator, created on first use"""
+    return PriceCalculator()
+
+async def close_price_calculator():
+    """Shut down the shared calculator's browsers if it has been created"""
+    if get_price_calculator.cache_info().currsize:
+        await get_price_calculator().close()
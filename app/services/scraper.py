@@ -43,7 +43,7 @@ class MaterialScraper:
                     continue
 
                 if not field_config.get('exists', True):
-                    logging.info(f"{field_type} field is configured as non-existent for this domain")
+                    logging.info("%s field is configured as non-existent for this domain", field_type)
                     continue
 
                 try:
@@ -59,11 +59,11 @@ class MaterialScraper:
                             field_info['options'] = options
 
                         dimension_fields[field_type] = field_info
-                        logging.info(f"Found {field_type} field: {field_info}")
+                        logging.info("Found %s field: %s", field_type, field_info)
                     else:
-                        logging.warning(f"Could not find {field_type} element with selector: {field_config['selector']}")
+                        logging.warning("Could not find %s element with selector: %s", field_type, field_config['selector'])
                 except Exception as e:
-                    logging.error(f"Error analyzing {field_type} field: {str(e)}")
+                    logging.error("Error analyzing %s field: %s", field_type, e)
 
             await browser.close()
             return dimension_fields
@@ -82,7 +82,7 @@ class MaterialScraper:
                         'text': text.strip()
                     })
         except Exception as e:
-            logging.error(f"Error getting select options: {str(e)}")
+            logging.error("Error getting select options: %s", e)
         return options
 
     async def _fill_dimension_field(self, page, field_config: Dict[str, Any], value: float) -> bool:
@@ -93,7 +93,7 @@ class MaterialScraper:
         try:
             element = await page.query_selector(field_config['selector'])
             if not element:
-                logging.error(f"Could not find element with selector: {field_config['selector']}")
+                logging.error("Could not find element with selector: %s", field_config['selector'])
                 return False
 
             if field_config['type'] == 'select':
@@ -103,7 +103,7 @@ class MaterialScraper:
                 return True
 
         except Exception as e:
-            logging.error(f"Error filling dimension field: {str(e)}")
+            logging.error("Error filling dimension field: %s", e)
             return False
 
     async def _fill_select_field(self, element, value: float) -> bool:
@@ -130,5 +130,5 @@ class MaterialScraper:
             return False
 
         except Exception as e:
-            logging.error(f"Error filling select field: {str(e)}")
+            logging.error("Error filling select field: %s", e)
             return False
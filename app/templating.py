@@ -0,0 +1,16 @@
+from pathlib import Path
+from fastapi.templating import Jinja2Templates
+from jinja2 import FileSystemBytecodeCache
+from app.core.config import IS_PRODUCTION
+
+# Get the project root directory (parent of app directory)
+BASE_DIR = Path(__file__).resolve().parent.parent
+TEMPLATES_DIR = BASE_DIR / "templates"
+
+# Shared templates for all HTML pages. In production the templates don't change,
+# so skip the stat() per render and reuse compiled bytecode across workers
+templates = Jinja2Templates(directory=str(TEMPLATES_DIR))
+templates.env.auto_reload = not IS_PRODUCTION
+templates.env.cache_size = 400
+if IS_PRODUCTION:
+    templates.env.bytecode_cache = FileSystemBytecodeCache()
@@ -0,0 +1,48 @@
+"""Start one shared Chromium that all API workers connect to over CDP.
+
+Run this next to the API and point the workers at it:
+
+    python scripts/start_chromium.py --port 9222
+    CHROMIUM_CDP_URL=http://127.0.0.1:9222 uvicorn app.main:app --workers 4
+"""
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from playwright.sync_api import sync_playwright
+
+from app.core.config import HEADLESS
+from app.services.price_calculator import _BASE_LAUNCH_ARGS
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared Chromium for CHROMIUM_CDP_URL")
+    parser.add_argument("--port", type=int, default=9222)
+    parser.add_argument("--user-data-dir", default="/tmp/opg-chromium")
+    args = parser.parse_args()
+
+    # Zelfde Chromium build als Playwright zelf zou starten
+    with sync_playwright() as p:
+        executable = p.chromium.executable_path
+
+    chromium_args = [
+        executable,
+        f"--remote-debugging-port={args.port}",
+        "--remote-debugging-address=127.0.0.1",
+        f"--user-data-dir={args.user_data_dir}",
+        "--no-first-run",
+        "--no-default-browser-check",
+        *_BASE_LAUNCH_ARGS,
+    ]
+    if HEADLESS:
+        chromium_args.append("--headless=new")
+    chromium_args.append("about:blank")
+
+    # exec zodat supervisord/docker het Chromium-proces zelf beheert
+    os.execv(executable, chromium_args)
+
+
+if __name__ == "__main__":
+    main()